@@ -2,7 +2,12 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import os
+import tempfile
 from dotenv import load_dotenv
+from .database import engine_options, env_flag, init_engine
+from .instrumentation import init_instrumentation
+from .metrics import init_metrics
+from .slow_queries import init_slow_query_log
 
 
 db = SQLAlchemy()
@@ -13,6 +18,38 @@ load_dotenv()
 def create_app(test_config=None):
     app = Flask(__name__)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["MAX_PAGE_SIZE"] = int(os.environ.get("MAX_PAGE_SIZE", 1000))
+    app.config["STREAM_BATCH_SIZE"] = int(
+        os.environ.get("STREAM_BATCH_SIZE", 1000))
+    app.config["BULK_INSERT_BATCH_SIZE"] = int(
+        os.environ.get("BULK_INSERT_BATCH_SIZE", 1000))
+    app.config["IMPORT_BATCH_SIZE"] = int(
+        os.environ.get("IMPORT_BATCH_SIZE", 5000))
+    app.config["IMPORT_MAX_ERRORS"] = int(
+        os.environ.get("IMPORT_MAX_ERRORS", 100))
+
+    # off unless chosen: "memory" is per process, "file" is shared by the
+    # workers of one host
+    app.config["CACHE_BACKEND"] = os.environ.get("CACHE_BACKEND", "none")
+    app.config["CACHE_TTL"] = float(os.environ.get("CACHE_TTL", 60))
+    app.config["CACHE_MAXSIZE"] = int(os.environ.get("CACHE_MAXSIZE", 10000))
+    app.config["CACHE_DIR"] = os.environ.get(
+        "CACHE_DIR", os.path.join(tempfile.gettempdir(), "task-list-cache"))
+
+    app.config["SLACK_BOT_TOKEN"] = os.environ.get("SLACK_BOT_TOKEN")
+    app.config["SLACK_API_URL"] = os.environ.get(
+        "SLACK_API_URL", "https://slack.com/api/chat.postMessage")
+    app.config["SLACK_CHANNEL"] = os.environ.get(
+        "SLACK_CHANNEL", "task-notifications-demo")
+    app.config["SLACK_TIMEOUT"] = float(os.environ.get("SLACK_TIMEOUT", 5))
+    app.config["OUTBOX_BATCH_SIZE"] = int(
+        os.environ.get("OUTBOX_BATCH_SIZE", 100))
+    app.config["OUTBOX_MAX_ATTEMPTS"] = int(
+        os.environ.get("OUTBOX_MAX_ATTEMPTS", 8))
+    app.config["OUTBOX_BACKOFF_BASE"] = float(
+        os.environ.get("OUTBOX_BACKOFF_BASE", 2))
+    app.config["OUTBOX_BACKOFF_MAX"] = float(
+        os.environ.get("OUTBOX_BACKOFF_MAX", 600))
 
     if test_config is None:
         app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
@@ -22,16 +59,79 @@ def create_app(test_config=None):
         app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get(
             "SQLALCHEMY_TEST_DATABASE_URI")
 
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(
+        os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"], app.config["DB_STATEMENT_TIMEOUT_MS"])
+    app.config["DB_POOL_WARMUP"] = env_flag("DB_POOL_WARMUP", False)
+
+    app.config["INSTRUMENTATION_ENABLED"] = env_flag(
+        "INSTRUMENTATION_ENABLED", False)
+    app.config["INSTRUMENTATION_SAMPLE_RATE"] = float(
+        os.environ.get("INSTRUMENTATION_SAMPLE_RATE", 1.0))
+    # shared by every worker of a pre-forking server; clear it on deploy
+    app.config["PROMETHEUS_MULTIPROC_DIR"] = os.environ.get(
+        "PROMETHEUS_MULTIPROC_DIR")
+    app.config["METRICS_FLUSH_INTERVAL"] = float(
+        os.environ.get("METRICS_FLUSH_INTERVAL", 1))
+
+    # 0 turns the slow-query log off
+    app.config["SLOW_QUERY_THRESHOLD_MS"] = float(
+        os.environ.get("SLOW_QUERY_THRESHOLD_MS", 500))
+    app.config["SLOW_QUERY_WINDOW"] = int(
+        os.environ.get("SLOW_QUERY_WINDOW", 300))
+    app.config["SLOW_QUERY_EXPLAIN"] = env_flag("SLOW_QUERY_EXPLAIN", True)
+
+    # memory serves one process; socket fans out across the workers of one
+    # host, postgres across hosts
+    app.config["EVENTS_BACKEND"] = os.environ.get("EVENTS_BACKEND", "memory")
+    app.config["EVENTS_SOCKET_DIR"] = os.environ.get(
+        "EVENTS_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "task-list-events"))
+    app.config["EVENTS_BUFFER_SIZE"] = int(
+        os.environ.get("EVENTS_BUFFER_SIZE", 1000))
+    app.config["EVENTS_QUEUE_SIZE"] = int(
+        os.environ.get("EVENTS_QUEUE_SIZE", 100))
+    app.config["EVENTS_KEEPALIVE"] = float(
+        os.environ.get("EVENTS_KEEPALIVE", 15))
+
     # Import models here for Alembic setup
     from app.models.task import Task
     from app.models.goal import Goal
+    from app.models.notification import Notification
+    from app.models.table_version import TableVersion
+    from app.models.tombstone import Tombstone
+    from app.models.import_job import ImportJob
 
     db.init_app(app)
     migrate.init_app(app, db)
+    engine = init_engine(app, db)
+    init_instrumentation(app, engine)
+    init_metrics(app, engine)
+    init_slow_query_log(app, engine)
 
     # Register Blueprints here
-    from .routes import task_bp, goal_bp
+    from .routes import (
+        task_bp, goal_bp, stats_bp, metrics_bp, changes_bp, events_bp, export_bp,
+        import_bp)
     app.register_blueprint(task_bp)
     app.register_blueprint(goal_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(changes_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(import_bp)
+
+    from .events import init_events
+    init_events(app, engine)
+
+    from .cache import init_cache
+    init_cache(app)
+
+    from .outbox import outbox_cli
+    app.cli.add_command(outbox_cli)
+
+    from .counters import counters_cli
+    app.cli.add_command(counters_cli)
 
     return app
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from app import db
+
+
+def insert_returning_ids(table, rows, batch_size):
+    (primary_key,) = table.primary_key.columns
+    connection = db.session.connection()
+    ids = []
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+
+        if connection.dialect.name == "postgresql":
+            # one multi-row INSERT ... VALUES (...), (...) RETURNING per
+            # batch; Postgres returns the keys in VALUES order
+            result = connection.execute(
+                table.insert().values(batch).returning(primary_key))
+            ids.extend(row[0] for row in result)
+        else:
+            # no RETURNING support in this dialect; still one transaction
+            for row in batch:
+                result = connection.execute(table.insert(), row)
+                ids.append(result.inserted_primary_key[0])
+
+    return ids
+
+
+def copy_rows(table, columns, rows):
+    if not rows:
+        return
+
+    connection = db.session.connection()
+
+    if connection.dialect.name == "postgresql":
+        # COPY streams the whole batch in one round trip with no per-row
+        # statement overhead. QUOTE_NONNUMERIC quotes every string, so an
+        # empty string stays "" while None is written bare and read as NULL
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerows([row[column] for column in columns] for row in rows)
+        buffer.seek(0)
+        connection.connection.cursor().copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer)
+    else:
+        connection.execute(table.insert(), rows)
+
+
+def update_returning(table, where, values, columns, previous=()):
+    # rows come back as tuples of `columns` with `values` already applied,
+    # followed by the `previous` columns as they were before the update
+    connection = db.session.connection()
+
+    if connection.dialect.name == "postgresql":
+        statement = table.update().values(values)
+        returning = list(columns)
+        if previous:
+            # RETURNING only sees the new row, so the old values come from
+            # a locked read of the same rows joined back on the primary key
+            old = db.select([*table.primary_key.columns, *previous]).where(
+                where).with_for_update().alias("previous")
+            statement = statement.where(db.and_(*(
+                column == old.c[column.key] for column in table.primary_key.columns)))
+            returning += [old.c[column.key] for column in previous]
+        else:
+            statement = statement.where(where)
+        return connection.execute(statement.returning(*returning)).fetchall()
+
+    # no RETURNING support in this dialect: read the matching rows, then
+    # update the same predicate in the same transaction
+    # labelled, or a column asked for twice would be selected only once
+    rows = connection.execute(db.select([
+        *columns, *(column.label(f"previous_{column.key}") for column in previous)
+    ]).where(where)).fetchall()
+    if rows:
+        connection.execute(table.update().where(where).values(values))
+    return [
+        tuple(values.get(column.key, value) for column, value in zip(columns, row))
+        + tuple(row[len(columns):])
+        for row in rows
+    ]
+
+
+def delete_returning(table, where, columns):
+    connection = db.session.connection()
+
+    if connection.dialect.name == "postgresql":
+        return connection.execute(
+            table.delete().where(where).returning(*columns)).fetchall()
+
+    rows = connection.execute(db.select(columns).where(where)).fetchall()
+    if rows:
+        connection.execute(table.delete().where(where))
+    return [tuple(row) for row in rows]
+
+
+def parse_ndjson(stream):
+    # one JSON document per line; lines that don't parse come back as None
+    # so they fail validation with the rest of the batch's bad items
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
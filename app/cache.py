@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_dict(self):
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions)
+
+
+class NullCache:
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key, version=None):
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value, version=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+
+class LRUCache:
+    # per-process: invalidations only reach the worker that made the
+    # change, so reads pass the table version and an entry stored under
+    # any other version is a miss. The version is table-wide, so any task
+    # write turns every cached task into a miss: never stale, but the hit
+    # rate falls as the write rate rises. Keying on a row's own change_seq
+    # would need the row read the cache is there to skip
+    def __init__(self, maxsize=10000, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires, entry_version, value = entry
+            if expires <= self.clock() or entry_version != version:
+                del self._entries[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key, value, version=None):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class FileCache:
+    # one JSON file per key in a directory every worker on the host shares,
+    # so an invalidation in one worker is seen by all of them. Versions
+    # work as in LRUCache. Every maxsize / 10 writes a worker sweeps the
+    # directory back down to maxsize, dropping the least recently read
+    # files, so it overshoots by at most that much per worker
+    def __init__(self, directory, ttl=60, maxsize=10000, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self.stats = CacheStats()
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".json")
+
+    def get(self, key, version=None):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                expires, entry_version, value = json.load(file)
+        except (OSError, ValueError):
+            self.stats.misses += 1
+            return None
+
+        if expires <= self.clock() or entry_version != version:
+            self._remove(path)
+            self.stats.evictions += 1
+            self.stats.misses += 1
+            return None
+
+        # the mtime is the file's last use, for sweep()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats.hits += 1
+        return value
+
+    def set(self, key, value, version=None):
+        # write-then-rename so readers never see a half-written entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump([self.clock() + self.ttl, version, value], file)
+        os.replace(temp_path, self._path(key))
+
+        self._writes += 1
+        if self._writes % max(1, self.maxsize // 10) == 0:
+            self.sweep()
+
+    def sweep(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue
+
+        excess = len(entries) - self.maxsize
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            self._remove(path)
+            self.stats.evictions += 1
+
+    def delete(self, *keys):
+        for key in keys:
+            self._remove(self._path(key))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def init_cache(app):
+    backend = app.config["CACHE_BACKEND"]
+
+    if backend == "memory":
+        cache = LRUCache(app.config["CACHE_MAXSIZE"], app.config["CACHE_TTL"])
+    elif backend == "file":
+        cache = FileCache(
+            app.config["CACHE_DIR"], app.config["CACHE_TTL"], app.config["CACHE_MAXSIZE"])
+    elif backend == "none":
+        cache = NullCache()
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    app.extensions["cache"] = cache
+
+
+def get_cache():
+    return current_app.extensions["cache"]
+
+
+def cache_key(kind, object_id):
+    try:
+        return f"{kind}:{int(object_id)}"
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,93 @@
+from flask import abort, make_response, request
+from sqlalchemy import column, tuple_
+from app import db
+from .models.goal import Goal
+from .models.table_version import CHANGES, TableVersion
+from .models.task import Task
+from .models.tombstone import Tombstone
+from .pagination import decode_cursor, encode_cursor, page_size
+
+# a position in the feed is (change_seq, source, id); rows of one
+# transaction share a change_seq, so source and id order them within it
+CURSOR_KEYS = [
+    column("change_seq", db.BigInteger),
+    column("source", db.Integer),
+    column("id", db.Integer),
+]
+GOAL_SOURCE, TASK_SOURCE, TOMBSTONE_SOURCE = 0, 1, 2
+
+
+def after(seq_column, id_column, source, position):
+    seq, after_source, after_id = position
+    if source > after_source:
+        return seq_column >= seq
+    if source < after_source:
+        return seq_column > seq
+    return tuple_(seq_column, id_column) > tuple_(seq, after_id)
+
+
+def read_position():
+    cursor = request.args.get("cursor")
+    if cursor:
+        return decode_cursor(cursor, CURSOR_KEYS)
+
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        since = -1
+    if since < 0:
+        abort(make_response(dict(details="Invalid since"), 400))
+
+    # past every source at `since`, i.e. everything numbered after it
+    return [since, TOMBSTONE_SOURCE + 1, 0]
+
+
+def read_changes():
+    position = read_position()
+    limit = page_size()
+    # read before the rows: anything committed in between shows up now and
+    # again next time, which is harmless, instead of being skipped
+    [(_, last_seq)] = TableVersion.current(CHANGES)
+
+    changes = []
+
+    goals = db.session.query(Goal.change_seq, *Goal.row_columns()).filter(
+        after(Goal.change_seq, Goal.goal_id, GOAL_SOURCE, position)
+    ).order_by(Goal.change_seq, Goal.goal_id).limit(limit + 1)
+    for seq, *row in goals:
+        changes.append(((seq, GOAL_SOURCE, row[0]), dict(
+            seq=seq, type="goal", op="upsert", goal=Goal.row_to_dict(row))))
+
+    tasks = db.session.query(Task.change_seq, *Task.row_columns()).filter(
+        after(Task.change_seq, Task.task_id, TASK_SOURCE, position)
+    ).order_by(Task.change_seq, Task.task_id).limit(limit + 1)
+    for seq, *row in tasks:
+        changes.append(((seq, TASK_SOURCE, row[0]), dict(
+            seq=seq, type="task", op="upsert", task=Task.row_to_dict(row))))
+
+    tombstones = db.session.query(
+        Tombstone.change_seq, Tombstone.tombstone_id, Tombstone.kind, Tombstone.object_id
+    ).filter(
+        after(Tombstone.change_seq, Tombstone.tombstone_id, TOMBSTONE_SOURCE, position)
+    ).order_by(Tombstone.change_seq, Tombstone.tombstone_id).limit(limit + 1)
+    for seq, tombstone_id, kind, object_id in tombstones:
+        changes.append(((seq, TOMBSTONE_SOURCE, tombstone_id), dict(
+            seq=seq, type=kind, op="delete", id=object_id)))
+
+    # each source returned its own first limit + 1, which always contains
+    # the first limit + 1 of the merged feed
+    changes.sort(key=lambda change: change[0])
+
+    if len(changes) > limit:
+        changes = changes[:limit]
+        return dict(
+            changes=[change for _, change in changes],
+            next_cursor=encode_cursor(list(changes[-1][0])),
+            last_seq=None,
+        )
+
+    return dict(
+        changes=[change for _, change in changes],
+        next_cursor=None,
+        last_seq=last_seq,
+    )
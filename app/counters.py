@@ -0,0 +1,38 @@
+import click
+from flask.cli import AppGroup
+from app import db
+from .events import record_event
+from .models.goal import Goal
+from .models.table_version import TableVersion
+
+counters_cli = AppGroup("counters", help="Maintain denormalized goal counters.")
+
+
+def reconcile():
+    # recompute every goal from task in one statement and report how many
+    # had drifted
+    computed = Goal.counter_values()
+    query = Goal.query.filter(db.or_(
+        Goal.task_count != computed[Goal.task_count],
+        Goal.completed_count != computed[Goal.completed_count],
+        Goal.last_completed_at.is_distinct_from(computed[Goal.last_completed_at]),
+    ))
+    drifted = query.count()
+
+    if drifted:
+        # only the drifted goals change, so only they get a new change_seq
+        query.update(
+            dict(computed, change_seq=TableVersion.next_change_seq("goal")),
+            synchronize_session=False)
+        # the change_seq taken above needs an event behind it, or the event
+        # stream would read the gap as missed messages
+        record_event("goal.counters_reconcile", dict(goals=drifted))
+    db.session.commit()
+
+    return drifted
+
+
+@counters_cli.command("reconcile")
+def reconcile_command():
+    drifted = reconcile()
+    click.echo(f"reconciled {drifted} goals")
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+class PoolWaitStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def to_dict(self):
+        return dict(
+            checkouts=self.checkouts,
+            wait_seconds_total=self.wait_seconds_total,
+            wait_seconds_max=self.wait_seconds_max,
+        )
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedQueuePool(QueuePool):
+    # _do_get is where a checkout blocks when every connection is busy
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - start)
+
+
+def env_flag(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def engine_options(uri, statement_timeout_ms=0):
+    # SQLite picks its own single-connection pool; the sizing knobs only
+    # mean something for a server database
+    if not uri or uri.startswith("sqlite"):
+        return {}
+
+    options = dict(
+        poolclass=TimedQueuePool,
+        pool_size=int(os.environ.get("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        pool_recycle=int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        pool_pre_ping=env_flag("DB_POOL_PRE_PING", True),
+    )
+
+    if statement_timeout_ms and uri.startswith("postgresql"):
+        # set once when the connection opens, so no transaction pays a
+        # round trip for it
+        options["connect_args"] = dict(
+            options=f"-c statement_timeout={int(statement_timeout_ms)}")
+
+    return options
+
+
+def statement_timeout_override():
+    # a route can raise or lower the budget for its own request through g
+    if has_app_context():
+        return g.get("statement_timeout_ms")
+    return None
+
+
+def init_engine(app, db):
+    engine = db.get_engine(app)
+
+    if engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "begin")
+        def set_statement_timeout(connection):
+            # the default comes with the connection (see engine_options);
+            # only a route's own budget costs a statement
+            timeout = statement_timeout_override()
+            if timeout is not None:
+                # LOCAL scopes it to this transaction, so it never leaks to
+                # the next request that checks the connection out
+                connection.execute(
+                    f"SET LOCAL statement_timeout = {int(timeout)}")
+
+    if app.config["DB_POOL_WARMUP"]:
+        warm_pool(engine)
+
+    return engine
+
+
+def warm_pool(engine):
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close()
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = pool_wait_stats.to_dict()
+
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            status[name] = method()
+
+    return status
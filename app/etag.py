@@ -0,0 +1,31 @@
+import functools
+from flask import current_app, g, make_response, request
+from .models.table_version import TableVersion
+
+
+def versioned(*tables):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # read the versions before the rows: a write that lands in
+            # between only makes the tag older than the body, never newer
+            versions = TableVersion.current(*tables)
+            etag = ".".join(f"{name}-{version}" for name, version in versions)
+            # the view tags anything it caches with these, so a cached body
+            # is only served under the version it was read at
+            g.table_versions = dict(versions)
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,346 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from flask import current_app, has_app_context
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app import db
+from .models.table_version import TableVersion
+
+logger = logging.getLogger("app.events")
+
+CHANNEL = "task_events"
+# NOTIFY payloads are capped at 8000 bytes; datagrams can be far larger
+MAX_NOTIFY_BYTES = 7900
+MAX_DATAGRAM_BYTES = 60000
+CLOSED = object()
+
+
+def encode(message, limit):
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) <= limit:
+        return payload
+
+    # too big for the transport: keep the event names and ids and let the
+    # client fetch the rest from /changes
+    message = dict(seq=message["seq"], events=[
+        dict(event=item["event"], data=dict(
+            {key: item["data"][key] for key in ("id",) if key in item["data"]},
+            truncated=True))
+        for item in message["events"]
+    ])
+    payload = json.dumps(message, separators=(",", ":"))
+    if len(payload.encode()) <= limit:
+        return payload
+
+    return json.dumps(dict(seq=message["seq"], events=[
+        dict(event="resync", data=dict(truncated=True))]))
+
+
+class Subscription:
+    def __init__(self, hub, maxsize):
+        self.hub = hub
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # a client that can't keep up is cut off instead of buffered
+            # without bound; it reconnects with Last-Event-ID and replays
+            # from the ring buffer
+            self.overflowed = True
+            self.hub.unsubscribe(self)
+
+    def get(self, timeout):
+        if self.overflowed and self.queue.empty():
+            return CLOSED
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return CLOSED if self.overflowed else None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    # fan-out to this process's clients, plus the recent messages a
+    # reconnecting client can resume from
+    def __init__(self, buffer_size=1000, queue_size=100):
+        self.recent = deque(maxlen=buffer_size)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self._lock = threading.Lock()
+
+    def dispatch(self, message):
+        with self._lock:
+            self.recent.append(message)
+            subscribers = list(self.subscribers)
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscribe(self, last_seq=None, current_seq=None):
+        # returns the subscription, the buffered messages after last_seq and
+        # whether those cover every change up to current_seq
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            self.subscribers.add(subscription)
+            if last_seq is None:
+                return subscription, [], True
+            backlog = [message for message in self.recent if message["seq"] > last_seq]
+
+        seen = {message["seq"] for message in backlog}
+        covered = current_seq is None or all(
+            seq in seen for seq in range(last_seq + 1, current_seq + 1))
+        return subscription, backlog, covered
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self.subscribers.discard(subscription)
+
+
+class MemoryBroker:
+    # single process: publishing is dispatching
+    transactional = False
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def ensure_listening(self):
+        pass
+
+    def publish(self, message):
+        self.hub.dispatch(message)
+
+    def subscribe(self, last_seq=None, current_seq=None):
+        self.ensure_listening()
+        return self.hub.subscribe(last_seq, current_seq)
+
+
+class ListeningBroker(MemoryBroker):
+    # the listener thread is started lazily and again after a fork, since
+    # threads don't survive into a pre-forked worker
+    def __init__(self, hub):
+        super().__init__(hub)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_listening(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self.start()
+                self._pid = os.getpid()
+
+
+class SocketBroker(ListeningBroker):
+    # every worker on the host binds a datagram socket in one directory and
+    # a publish is sent to all of them, itself included
+    def __init__(self, hub, directory):
+        super().__init__(hub)
+        self.directory = directory
+        self.path = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{uuid.uuid4().hex}.sock")
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.socket.bind(self.path)
+        atexit.register(self.close)
+        threading.Thread(target=self.listen, args=(self.socket,), daemon=True).start()
+
+    def listen(self, sock):
+        while True:
+            try:
+                data = sock.recv(MAX_DATAGRAM_BYTES)
+            except OSError:
+                return
+            try:
+                self.hub.dispatch(json.loads(data))
+            except ValueError:
+                logger.warning("dropped a malformed event datagram")
+
+    def publish(self, message):
+        self.ensure_listening()
+        payload = encode(message, MAX_DATAGRAM_BYTES).encode()
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        # a worker that stopped reading must not stall the request
+        sender.setblocking(False)
+        try:
+            for name in os.listdir(self.directory):
+                if not name.endswith(".sock"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    sender.sendto(payload, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # left behind by a worker that has exited
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                except OSError as error:
+                    logger.warning(f"dropped an event for {name}: {error}")
+        finally:
+            sender.close()
+
+    def close(self):
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.socket.close()
+            self.path = None
+
+
+class PostgresBroker(ListeningBroker):
+    # NOTIFY is sent inside the writing transaction, so Postgres delivers it
+    # only on commit and in commit order
+    transactional = True
+
+    def __init__(self, hub, engine):
+        super().__init__(hub)
+        self.engine = engine
+
+    def publish_in_transaction(self, session, message):
+        session.execute(func.pg_notify(CHANNEL, encode(message, MAX_NOTIFY_BYTES)).select())
+
+    def start(self):
+        threading.Thread(target=self.listen, daemon=True).start()
+
+    def listen(self):
+        while True:
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                # this connection is ours for good, not the pool's
+                connection.detach()
+                dbapi_connection = connection.connection
+                dbapi_connection.autocommit = True
+                dbapi_connection.cursor().execute(f"LISTEN {CHANNEL}")
+
+                while True:
+                    if select.select([dbapi_connection], [], [], 5) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        notify = dbapi_connection.notifies.pop(0)
+                        self.hub.dispatch(json.loads(notify.payload))
+            except Exception:
+                # anything missed while reconnecting shows up as a gap, and
+                # resuming clients are told to resync
+                logger.exception("event listener lost its connection")
+                time.sleep(1)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+def get_broker():
+    if has_app_context():
+        return current_app.extensions.get("events")
+    return None
+
+
+def record_event(name, data):
+    # queued on the session and published once the transaction commits
+    db.session.info["events_seq"] = TableVersion.next_change_seq()
+    db.session.info.setdefault("events", []).append(dict(event=name, data=data))
+
+
+def pending_message(session):
+    events = session.info.get("events")
+    if not events:
+        return None
+    return dict(seq=session.info["events_seq"], events=events)
+
+
+@event.listens_for(Session, "before_commit")
+def notify_in_transaction(session):
+    broker = get_broker()
+    message = pending_message(session)
+    if broker is not None and broker.transactional and message:
+        broker.publish_in_transaction(session, message)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_after_commit(session):
+    broker = get_broker()
+    message = pending_message(session)
+    if broker is not None and not broker.transactional and message:
+        broker.publish(message)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_events(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("events", None)
+        session.info.pop("events_seq", None)
+
+
+def format_message(message):
+    lines = []
+    for index, item in enumerate(message["events"]):
+        lines.append(f"event: {item['event']}")
+        lines.append(f"data: {json.dumps(item['data'], separators=(',', ':'))}")
+        # the id goes on the message's last event only, so a client that
+        # resumes never skips the rest of a transaction
+        if index == len(message["events"]) - 1:
+            lines.append(f"id: {message['seq']}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def stream_events(subscription, backlog, keepalive, reset=None):
+    try:
+        if reset is not None:
+            # the gap is older than this worker's buffer: the client catches
+            # up from /changes?since=<since> and carries on from last_seq
+            since, last_seq = reset
+            yield format_message(dict(seq=last_seq, events=[
+                dict(event="reset", data=dict(since=since, last_seq=last_seq))]))
+            backlog = [message for message in backlog if message["seq"] > last_seq]
+
+        for message in backlog:
+            yield format_message(message)
+
+        while True:
+            message = subscription.get(keepalive)
+            if message is CLOSED:
+                return
+            if message is None:
+                # a comment line keeps proxies from timing the stream out
+                yield ": keepalive\n\n"
+                continue
+            yield format_message(message)
+    finally:
+        subscription.close()
+
+
+def init_events(app, engine):
+    hub = EventHub(app.config["EVENTS_BUFFER_SIZE"], app.config["EVENTS_QUEUE_SIZE"])
+    backend = app.config["EVENTS_BACKEND"]
+
+    if backend == "memory":
+        broker = MemoryBroker(hub)
+    elif backend == "socket":
+        broker = SocketBroker(hub, app.config["EVENTS_SOCKET_DIR"])
+    elif backend == "postgres":
+        broker = PostgresBroker(hub, engine)
+    else:
+        raise ValueError(f"Unknown EVENTS_BACKEND: {backend}")
+
+    app.extensions["events"] = broker
+    return broker
@@ -0,0 +1,166 @@
+import csv
+import datetime
+import io
+import json
+import zlib
+from flask import Response, abort, current_app, make_response, request, stream_with_context
+from app import db
+from .models.goal import Goal
+from .models.table_version import CHANGES, TableVersion
+from .models.task import Task
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+# the fastest level: export rows are repetitive enough that it still
+# shrinks them about 8x, and the default level would cap throughput
+GZIP_LEVEL = 1
+
+# (name, column) pairs; change_seq lets a consumer pick its next
+# updated_since from the data itself
+TASK_EXPORT = (
+    ("id", Task.task_id),
+    ("title", Task.title),
+    ("description", Task.description),
+    ("completed_at", Task.completed_at),
+    ("goal_id", Task.goal_id),
+    ("change_seq", Task.change_seq),
+)
+GOAL_EXPORT = (
+    ("id", Goal.goal_id),
+    ("title", Goal.title),
+    ("task_count", Goal.task_count),
+    ("completed_count", Goal.completed_count),
+    ("last_completed_at", Goal.last_completed_at),
+    ("change_seq", Goal.change_seq),
+)
+
+
+def negotiate():
+    # no Accept header, or */*, means NDJSON
+    if not request.accept_mimetypes:
+        return NDJSON
+
+    mimetype = request.accept_mimetypes.best_match([NDJSON, CSV])
+    if mimetype is None:
+        abort(make_response(dict(
+            details=f"Not Acceptable: use {NDJSON} or {CSV}"), 406))
+    return mimetype
+
+
+def read_updated_since():
+    if "updated_since" not in request.args:
+        return None
+
+    try:
+        since = int(request.args["updated_since"])
+    except ValueError:
+        since = -1
+    if since < 0:
+        abort(make_response(dict(details="Invalid updated_since"), 400))
+    return since
+
+
+def isoformat(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# json.dumps with options builds a new encoder per call, which was most of
+# the cost of an export
+ENCODER = json.JSONEncoder(
+    default=isoformat, ensure_ascii=False, separators=(",", ":"))
+
+
+def ndjson_batch(names, rows):
+    encode = ENCODER.encode
+    return "".join([encode(dict(zip(names, row))) + "\n" for row in rows])
+
+
+def csv_batch(names, rows, datetime_indexes):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if datetime_indexes:
+        rows = [
+            [value.isoformat() if index in datetime_indexes and value is not None
+             else value for index, value in enumerate(row)]
+            for row in rows
+        ]
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def generate(statement, names, mimetype, datetime_indexes):
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+
+    if mimetype == CSV:
+        yield ",".join(names) + "\n"
+
+    # a connection of its own, outside the request session: psycopg2 turns
+    # stream_results into a named server-side cursor, so only one batch of
+    # rows is held in the worker at a time however big the table is
+    with db.engine.connect() as connection, connection.begin():
+        result = connection.execution_options(stream_results=True).execute(statement)
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            if mimetype == CSV:
+                yield csv_batch(names, rows, datetime_indexes)
+            else:
+                yield ndjson_batch(names, rows)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(fields, order_by, seq_column, name):
+    mimetype = negotiate()
+    since = read_updated_since()
+    # read before the rows, like /changes: a write that lands during the
+    # export may appear now and again in the next one, but is never missed
+    [(_, last_seq)] = TableVersion.current(CHANGES)
+    # the rows stream on a connection of their own; the session's would
+    # otherwise sit idle in a transaction until the export finishes
+    db.session.remove()
+
+    names = [field for field, _ in fields]
+    statement = db.select([column for _, column in fields])
+    if since is None:
+        statement = statement.order_by(*order_by)
+    else:
+        # served by the (change_seq, id) index
+        statement = statement.where(seq_column > since).order_by(
+            seq_column, *order_by)
+
+    datetime_indexes = {
+        index for index, (_, column) in enumerate(fields)
+        if isinstance(column.type, db.DateTime)
+    }
+    chunks = generate(statement, names, mimetype, datetime_indexes)
+
+    headers = {
+        "X-Last-Seq": str(last_seq),
+        "Vary": "Accept, Accept-Encoding",
+        "Content-Disposition": f"attachment; filename={name}"
+        f".{'csv' if mimetype == CSV else 'ndjson'}",
+    }
+    if request.accept_encodings["gzip"] > 0:
+        chunks = gzipped(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+def export_tasks():
+    return export_response(TASK_EXPORT, [Task.task_id], Task.change_seq, "tasks")
+
+
+def export_goals():
+    return export_response(GOAL_EXPORT, [Goal.goal_id], Goal.change_seq, "goals")
@@ -0,0 +1,89 @@
+import datetime
+from flask import abort, make_response
+from app import db
+from .models.task import Task
+
+TRUE_VALUES = ("true", "1", "yes")
+FALSE_VALUES = ("false", "0", "no")
+
+
+def invalid(name):
+    abort(make_response(dict(details=f"Invalid {name}"), 400))
+
+
+def parse_bool(args, name):
+    value = args[name].lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    invalid(name)
+
+
+def parse_datetime(args, name):
+    try:
+        value = datetime.datetime.fromisoformat(args[name].replace("Z", "+00:00"))
+    except ValueError:
+        invalid(name)
+
+    # completed_at is stored as naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def title_prefix_filter(prefix):
+    if db.engine.dialect.name == "postgresql":
+        # LIKE 'prefix%' is served by ix_task_title_pattern whatever the
+        # database collation is
+        return Task.title.startswith(prefix, autoescape=True)
+
+    # SQLite's LIKE is case-insensitive and skips the index, but a range
+    # over the binary-collated title index matches exactly the prefix
+    last = ord(prefix[-1])
+    if last == 0x10FFFF:
+        return Task.title >= prefix
+    return db.and_(Task.title >= prefix,
+                   Task.title < prefix[:-1] + chr(last + 1))
+
+
+FILTERS = ("is_complete", "goal_id", "completed_after", "completed_before",
+           "title_prefix")
+
+
+def task_criteria(args):
+    # every filter is a plain predicate on an indexed column, so they
+    # compose with each other and with the keyset ordering in one query
+    criteria = []
+
+    if "is_complete" in args:
+        if parse_bool(args, "is_complete"):
+            criteria.append(Task.completed_at.isnot(None))
+        else:
+            criteria.append(Task.completed_at.is_(None))
+
+    if "goal_id" in args:
+        if args["goal_id"].lower() == "none":
+            criteria.append(Task.goal_id.is_(None))
+        else:
+            try:
+                criteria.append(Task.goal_id == int(args["goal_id"]))
+            except ValueError:
+                invalid("goal_id")
+
+    if "completed_after" in args:
+        criteria.append(
+            Task.completed_at >= parse_datetime(args, "completed_after"))
+
+    if "completed_before" in args:
+        criteria.append(
+            Task.completed_at < parse_datetime(args, "completed_before"))
+
+    if args.get("title_prefix"):
+        criteria.append(title_prefix_filter(args["title_prefix"]))
+
+    return criteria
+
+
+def filter_tasks(query, args):
+    return query.filter(*task_criteria(args))
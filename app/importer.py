@@ -0,0 +1,229 @@
+import csv
+import datetime
+import itertools
+import logging
+from flask import abort, current_app, make_response, request
+from app import db
+from .bulk import copy_rows, insert_returning_ids, parse_ndjson
+from .events import record_event
+from .models.goal import Goal
+from .models.import_job import ImportJob
+from .models.table_version import TableVersion
+from .models.task import Task
+
+logger = logging.getLogger("app.importer")
+
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+TASK_COLUMNS = ("title", "description", "completed_at", "goal_id", "change_seq")
+# CSV has no way to leave these out but an empty cell
+OPTIONAL_CSV_FIELDS = {"completed_at", "goal_id", "goal"}
+
+
+def parse_csv(stream):
+    # the reader pulls one line at a time, so a quoted field spanning lines
+    # still parses without the upload ever being held in memory
+    lines = (line.decode("utf-8") for line in stream)
+    for record in csv.DictReader(lines):
+        # an empty optional cell means "not given", like a missing JSON key;
+        # an empty description is still a description
+        yield {key: value for key, value in record.items()
+               if value != "" or key not in OPTIONAL_CSV_FIELDS}
+
+
+def parse_completed_at(value):
+    try:
+        value = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("Invalid completed_at")
+
+    # completed_at is stored as naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_record(record):
+    # Task.from_dict's rules, plus the fields an import can carry on top:
+    # completed_at, and a goal given by goal_id or by title
+    try:
+        row = Task.row_from_dict(record)
+    except (KeyError, TypeError):
+        raise ValueError("Invalid data")
+
+    completed_at = record.get("completed_at")
+    row["completed_at"] = parse_completed_at(completed_at) if completed_at else None
+
+    goal = None
+    if record.get("goal_id") is not None:
+        try:
+            goal = ("id", int(record["goal_id"]))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid goal_id")
+    elif record.get("goal") is not None:
+        goal = ("title", str(record["goal"]))
+
+    return row, goal
+
+
+def resolve_goals(refs, goal_titles):
+    # ids must exist; titles map to the oldest goal with that title, or to
+    # a goal created for them. Returns the ids found
+    ids = {value for kind, value in refs if kind == "id"}
+    known = {
+        goal_id for (goal_id,) in
+        db.session.query(Goal.goal_id).filter(Goal.goal_id.in_(ids))
+    } if ids else set()
+
+    titles = {value for kind, value in refs if kind == "title"} - goal_titles.keys()
+    if not titles:
+        return known
+
+    goal_titles.update(
+        db.session.query(Goal.title, db.func.min(Goal.goal_id))
+        .filter(Goal.title.in_(titles)).group_by(Goal.title))
+    missing = sorted(titles - goal_titles.keys())
+    created = insert_returning_ids(
+        Goal.__table__,
+        [dict(title=title, change_seq=TableVersion.next_change_seq("task", "goal"))
+         for title in missing],
+        current_app.config["BULK_INSERT_BATCH_SIZE"])
+    goal_titles.update(zip(missing, created))
+
+    return known
+
+
+def import_batch(job, batch, goal_titles):
+    # one transaction: the batch's tasks, the goals they create, the
+    # counters they change and the job's progress commit together, so
+    # rows_read is always exactly where a resumed upload picks up
+    parsed = []
+    rejected = []
+    for number, record in batch:
+        try:
+            parsed.append((number, *parse_record(record)))
+        except ValueError as error:
+            rejected.append(dict(row=number, details=str(error)))
+
+    known = resolve_goals(
+        [goal for _, _, goal in parsed if goal], goal_titles)
+
+    rows = []
+    for number, row, goal in parsed:
+        if goal is None:
+            goal_id = None
+        elif goal[0] == "title":
+            goal_id = goal_titles[goal[1]]
+        elif goal[1] in known:
+            goal_id = goal[1]
+        else:
+            rejected.append(dict(row=number, details=f"Unknown Goal id: {goal[1]}"))
+            continue
+        rows.append(dict(row, goal_id=goal_id))
+
+    # a batch with nothing to write takes no change_seq, so the event
+    # stream never sees a number with no event behind it
+    if rows:
+        change_seq = TableVersion.next_change_seq("task")
+        for row in rows:
+            row["change_seq"] = change_seq
+        copy_rows(Task.__table__, TASK_COLUMNS, rows)
+        Goal.apply_counter_deltas(
+            (row["goal_id"], 1, int(row["completed_at"] is not None)) for row in rows)
+        record_event("task.import", dict(import_id=job.import_id, rows=len(rows)))
+
+    rejected.sort(key=lambda error: error["row"])
+    room = current_app.config["IMPORT_MAX_ERRORS"] - len(job.errors)
+    if rejected and room > 0:
+        job.errors = job.errors + rejected[:room]
+    job.rows_read += len(batch)
+    job.rows_imported += len(rows)
+    job.rows_rejected += len(rejected)
+    job.updated_at = datetime.datetime.utcnow()
+    db.session.commit()
+
+
+def run_import(job, records):
+    batch_size = current_app.config["IMPORT_BATCH_SIZE"]
+    import_id = job.import_id
+    # numbered from 1 in upload order, skipping what earlier attempts committed
+    records = itertools.islice(enumerate(records, start=1), job.rows_read, None)
+    goal_titles = {}
+
+    while True:
+        first_row = job.rows_read + 1
+        try:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                break
+            import_batch(job, batch, goal_titles)
+        except Exception as error:
+            logger.exception(f"import {import_id} failed")
+            db.session.rollback()
+            job = ImportJob.query.get(import_id)
+            job.status = "failed"
+            job.details = f"Batch starting at row {first_row} failed: {error}"
+            job.updated_at = datetime.datetime.utcnow()
+            db.session.commit()
+            return job
+
+    job.status = "completed"
+    job.updated_at = datetime.datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+def import_tasks():
+    if request.mimetype == NDJSON:
+        records = parse_ndjson(request.stream)
+    elif request.mimetype == CSV:
+        records = parse_csv(request.stream)
+    else:
+        abort(make_response(dict(
+            details=f"Unsupported Content-Type: use {NDJSON} or {CSV}"), 415))
+
+    import_id = request.args.get("import_id")
+    if import_id:
+        job = ImportJob.query.get(import_id) if import_id.isdigit() else None
+        if not job:
+            abort(make_response(dict(
+                details=f"Unknown Import id: {import_id}"
+            ), 404))
+        if job.format != request.mimetype:
+            abort(make_response(dict(
+                details=f"Import {job.import_id} was a {job.format} upload"
+            ), 400))
+        # only a failed job can resume, and only one request can claim it:
+        # the update matches no row once another resume has set it running
+        claimed = ImportJob.query.filter_by(
+            import_id=job.import_id, status="failed"
+        ).update(dict(status="running", details=None), synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            abort(make_response(dict(
+                details=f"Import {job.import_id} is {job.status}"
+            ), 409))
+        db.session.refresh(job)
+    else:
+        job = ImportJob(format=request.mimetype, errors=[])
+        db.session.add(job)
+
+    # committed up front so GET /import/tasks/<id> can follow the progress
+    db.session.commit()
+    job = run_import(job, records)
+
+    if job.status == "failed":
+        return make_response(dict(details=job.details, report=job.to_dict()), 500)
+
+    return dict(report=job.to_dict()), 200 if import_id else 201
+
+
+def get_import(import_id):
+    job = ImportJob.query.get(import_id) if import_id.isdigit() else None
+
+    if not job:
+        abort(make_response(dict(
+            details=f"Unknown Import id: {import_id}"
+        ), 404))
+
+    return dict(report=job.to_dict())
@@ -0,0 +1,126 @@
+import contextlib
+import json
+import logging
+import random
+import time
+from flask import g, has_request_context, request
+from flask.json import JSONEncoder
+from sqlalchemy import event
+
+logger = logging.getLogger("app.requests")
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.http = 0.0
+
+
+def current_timings():
+    if has_request_context():
+        return g.get("timings")
+    return None
+
+
+@contextlib.contextmanager
+def external_call():
+    # wrap outbound HTTP so it shows up as its own Server-Timing metric
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = current_timings()
+        if timings is not None:
+            timings.http += time.perf_counter() - start
+
+
+class TimedJSONEncoder(JSONEncoder):
+    def encode(self, o):
+        start = time.perf_counter()
+        try:
+            return super().encode(o)
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                timings.serialize += time.perf_counter() - start
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_timings() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings()
+    started = conn.info.get("query_started")
+    if timings is not None and started:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started.pop()
+
+
+def handle_error(context):
+    # a failed statement never reaches after_cursor_execute
+    if current_timings() is None or context.connection is None:
+        return
+    started = context.connection.info.get("query_started")
+    if started:
+        started.pop()
+
+
+def finish_request_timing(response):
+    timings = g.get("timings")
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings.started
+    other = max(0.0, total - timings.db - timings.serialize - timings.http)
+    ms = dict(
+        db=timings.db * 1000,
+        serialize=timings.serialize * 1000,
+        http=timings.http * 1000,
+        app=other * 1000,
+        total=total * 1000,
+    )
+
+    response.headers["Server-Timing"] = ", ".join([
+        f'db;dur={ms["db"]:.2f};desc="{timings.queries} queries"',
+        f'serialize;dur={ms["serialize"]:.2f}',
+        f'http;dur={ms["http"]:.2f}',
+        f'app;dur={ms["app"]:.2f}',
+        f'total;dur={ms["total"]:.2f}',
+    ])
+
+    logger.info(json.dumps(dict(
+        event="request",
+        method=request.method,
+        path=request.path,
+        endpoint=request.endpoint,
+        status=response.status_code,
+        queries=timings.queries,
+        **{f"{name}_ms": round(value, 3) for name, value in ms.items()},
+    )))
+
+    return response
+
+
+def init_instrumentation(app, engine):
+    # nothing is hooked unless it's switched on, so the default costs nothing
+    if not app.config["INSTRUMENTATION_ENABLED"]:
+        return
+
+    sample_rate = app.config["INSTRUMENTATION_SAMPLE_RATE"]
+
+    @app.before_request
+    def sample_request():
+        if random.random() < sample_rate:
+            g.timings = RequestTimings()
+
+    app.after_request(finish_request_timing)
+    app.json_encoder = TimedJSONEncoder
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
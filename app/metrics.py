@@ -0,0 +1,378 @@
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import defaultdict
+from flask import current_app, g, has_app_context, request
+from .database import pool_status
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+DESCRIPTIONS = {
+    "http_requests_total": ("counter", "Requests handled, by endpoint and status."),
+    "http_request_duration_seconds": ("histogram", "Request latency by endpoint."),
+    "slack_request_duration_seconds": ("histogram", "Outbound Slack API call latency."),
+    "db_pool_checkout_wait_seconds_total": ("counter", "Time spent waiting for a pooled connection."),
+    "db_pool_checkouts_total": ("counter", "Pooled connection checkouts."),
+    "db_pool_size": ("gauge", "Configured pool size per process."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out per process."),
+    "db_pool_overflow": ("gauge", "Overflow connections open per process."),
+    "cache_hits_total": ("counter", "Read-through cache hits."),
+    "cache_misses_total": ("counter", "Read-through cache misses."),
+    "cache_evictions_total": ("counter", "Read-through cache evictions."),
+}
+
+
+# dead workers' files are folded into this one, so the directory doesn't
+# grow with every restart
+ARCHIVE = "metrics_archive.json"
+
+# every store in this process. One flusher thread and one set of fork and
+# exit hooks serve them all, however many apps the process creates
+stores = weakref.WeakSet()
+flusher = None
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class MetricsStore:
+    # every process keeps its own samples and a background thread writes
+    # them to <directory>/metrics_<pid>_<start>.json every flush_interval,
+    # idle or not; a scrape sums every file, so counters survive worker
+    # restarts and aggregate across pre-forked workers
+    def __init__(self, directory=None, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.collectors = []
+        self.reset()
+        stores.add(self)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            start_flusher()
+
+    def reset(self):
+        self.process_id = f"{os.getpid()}_{int(time.time() * 1000)}"
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.gauges = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, name, labels=None, value=1):
+        with self._lock:
+            self.counters[(name, label_key(labels or {}))] += value
+
+    def set_total(self, name, value, labels=None):
+        # for totals a process already keeps itself, e.g. the pool stats
+        with self._lock:
+            self.counters[(name, label_key(labels or {}))] = value
+
+    def set_gauge(self, name, value, labels=None):
+        with self._lock:
+            self.gauges[(name, label_key(labels or {}))] = value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, label_key(labels or {}))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = dict(
+                    buckets=list(buckets), counts=[0] * len(buckets), sum=0.0, count=0)
+            for index, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][index] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def collect_local(self):
+        for collector in self.collectors:
+            collector(self)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(
+                pid=os.getpid(),
+                counters=[[name, labels, value]
+                          for (name, labels), value in self.counters.items()],
+                histograms=[[name, labels, histogram]
+                            for (name, labels), histogram in self.histograms.items()],
+                gauges=[[name, labels, value]
+                        for (name, labels), value in self.gauges.items()],
+            )
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+
+        self.collect_local()
+        try:
+            write_json(self.directory, self.path(), self.snapshot())
+        except OSError:
+            # losing a flush only delays the numbers
+            pass
+
+    def path(self):
+        return os.path.join(self.directory, f"metrics_{self.process_id}.json")
+
+    def prune(self):
+        # under a lock, or two scrapes could both fold the same file
+        archive = os.path.join(self.directory, ARCHIVE)
+        try:
+            with open(os.path.join(self.directory, "prune.lock"), "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                dead = []
+                for name in os.listdir(self.directory):
+                    path = os.path.join(self.directory, name)
+                    if not name.endswith(".json") or name == ARCHIVE:
+                        continue
+                    try:
+                        with open(path) as file:
+                            snapshot = json.load(file)
+                    except (OSError, ValueError):
+                        continue
+                    if snapshot["pid"] != os.getpid() and not process_alive(snapshot["pid"]):
+                        dead.append((path, snapshot))
+                if not dead:
+                    return
+
+                snapshots = [snapshot for _, snapshot in dead]
+                if os.path.exists(archive):
+                    with open(archive) as file:
+                        snapshots.append(json.load(file))
+                counters, histograms = sum_samples(snapshots)
+                write_json(self.directory, archive, dict(
+                    pid=None,
+                    counters=[[name, labels, value]
+                              for (name, labels), value in counters.items()],
+                    histograms=[[name, labels, histogram]
+                                for (name, labels), histogram in histograms.items()],
+                    gauges=[],
+                ))
+                for path, _ in dead:
+                    os.remove(path)
+        except (OSError, ValueError):
+            # the files stay and are summed as they are
+            pass
+
+    def snapshots(self):
+        self.collect_local()
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+        self.prune()
+
+        snapshots = [own]
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".json") or path == self.path():
+                continue
+            try:
+                with open(path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def counter_totals(self, *names):
+        # summed over every worker's last flush, like render()
+        totals = dict.fromkeys(names, 0)
+        for snapshot in self.snapshots():
+            for name, labels, value in snapshot["counters"]:
+                if name in totals:
+                    totals[name] += value
+        return totals
+
+    def render(self):
+        snapshots = self.snapshots()
+        counters, histograms = sum_samples(snapshots)
+        gauges = {}
+
+        for snapshot in snapshots:
+            # gauges describe a live process, so dead workers drop out
+            if not snapshot["gauges"]:
+                continue
+            if snapshot["pid"] == os.getpid() or process_alive(snapshot["pid"]):
+                for name, labels, value in snapshot["gauges"]:
+                    key = (name, tuple(map(tuple, labels)) + (("pid", str(snapshot["pid"])),))
+                    gauges[key] = value
+
+        lines = []
+        for name in sorted({key[0] for key in [*counters, *histograms, *gauges]}):
+            kind, description = DESCRIPTIONS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+            for (metric, labels), value in sorted(gauges.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                    cumulative += count
+                    bucket_labels = labels + (("le", format_value(bound)),)
+                    lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+                inf_labels = labels + (("le", "+Inf"),)
+                lines.append(f"{name}_bucket{format_labels(inf_labels)} {histogram['count']}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram['sum'])}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+def sum_samples(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, histogram in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, dict(
+                buckets=histogram["buckets"],
+                counts=[0] * len(histogram["buckets"]), sum=0.0, count=0))
+            total["counts"] = [a + b for a, b in zip(total["counts"], histogram["counts"])]
+            total["sum"] += histogram["sum"]
+            total["count"] += histogram["count"]
+    return counters, histograms
+
+
+def write_json(directory, path, data):
+    # write-then-rename so a scrape never reads half a file
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(data, file)
+    os.replace(temp_path, path)
+
+
+def flush_loop():
+    while True:
+        intervals = [store.flush_interval for store in list(stores) if store.directory]
+        time.sleep(min(intervals, default=1.0))
+        for store in list(stores):
+            store.flush()
+
+
+def start_flusher():
+    global flusher
+    if flusher is None:
+        flusher = threading.Thread(target=flush_loop, name="metrics-flush", daemon=True)
+        flusher.start()
+
+
+def flush_all():
+    for store in list(stores):
+        store.flush(force=True)
+
+
+def after_fork_in_child():
+    # a worker forked from a preloaded app starts on its own file with its
+    # own samples, or every worker would overwrite the same file; threads
+    # don't survive a fork, so it also needs its own flusher
+    global flusher
+    flusher = None
+    for store in list(stores):
+        store.reset()
+        if store.directory:
+            start_flusher()
+
+
+atexit.register(flush_all)
+os.register_at_fork(after_in_child=after_fork_in_child)
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+def format_value(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def get_metrics():
+    if has_app_context():
+        return current_app.extensions.get("metrics")
+    return None
+
+
+def init_metrics(app, engine):
+    store = MetricsStore(
+        app.config["PROMETHEUS_MULTIPROC_DIR"], app.config["METRICS_FLUSH_INTERVAL"])
+    app.extensions["metrics"] = store
+
+    def collect_pool(store):
+        status = pool_status(engine)
+        store.set_total("db_pool_checkouts_total", status["checkouts"])
+        store.set_total(
+            "db_pool_checkout_wait_seconds_total", status["wait_seconds_total"])
+        for name, key in (("db_pool_size", "size"),
+                          ("db_pool_checked_out", "checkedout"),
+                          ("db_pool_overflow", "overflow")):
+            if key in status:
+                store.set_gauge(name, status[key])
+
+    def collect_cache(store):
+        stats = app.extensions["cache"].stats
+        store.set_total("cache_hits_total", stats.hits)
+        store.set_total("cache_misses_total", stats.misses)
+        store.set_total("cache_evictions_total", stats.evictions)
+
+    store.collectors.extend([collect_pool, collect_cache])
+
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        store.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - started,
+            dict(endpoint=endpoint, method=request.method),
+        )
+        store.inc(
+            "http_requests_total",
+            dict(endpoint=endpoint, method=request.method,
+                 status=str(response.status_code)),
+        )
+        return response
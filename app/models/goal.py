@@ -1,17 +1,109 @@
 from app import db
+from .table_version import TableVersion
 
 
 class Goal(db.Model):
     goal_id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String, nullable=False)
-    tasks = db.relationship("Task", back_populates="goal")
+    # denormalized from task by apply_counter_deltas, which also stamps
+    # change_seq so incremental exports pick up the new counts
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    completed_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+    # the change feed position of the transaction that last wrote the row
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
+    tasks = db.relationship(
+        "Task", back_populates="goal", order_by="Task.task_id")
+
+    __table_args__ = (
+        db.Index("ix_goal_change_seq_goal_id", "change_seq", "goal_id"),
+    )
+
+    @classmethod
+    def row_columns(cls):
+        return (cls.goal_id, cls.title)
+
+    @staticmethod
+    def row_to_dict(row):
+        goal_id, title = row
+        return dict(
+            id=goal_id,
+            title=title,
+        )
 
     def to_dict(self):
+        return self.row_to_dict((self.goal_id, self.title))
+
+    @classmethod
+    def progress_columns(cls):
+        return (cls.task_count, cls.completed_count, cls.last_completed_at)
+
+    @staticmethod
+    def progress_to_dict(row):
+        task_count, completed_count, last_completed_at = row
         return dict(
-            id=self.goal_id,
-            title=self.title,
+            task_count=task_count,
+            completed_count=completed_count,
+            last_completed_at=last_completed_at.isoformat()
+            if last_completed_at else None,
         )
-    
+
+    @classmethod
+    def counter_values(cls):
+        from .task import Task
+
+        def of_goal(column):
+            return db.select([column]).where(
+                Task.goal_id == cls.goal_id).as_scalar()
+
+        return {
+            cls.task_count: of_goal(db.func.count(Task.task_id)),
+            cls.completed_count: of_goal(db.func.count(Task.completed_at)),
+            cls.last_completed_at: of_goal(db.func.max(Task.completed_at)),
+        }
+
+    @classmethod
+    def apply_counter_deltas(cls, changes):
+        # changes are (goal_id, tasks added, completed tasks added) triples,
+        # either count negative. The counters move by the summed deltas in
+        # one UPDATE inside the caller's transaction, so the cost doesn't
+        # grow with a goal's task list; last_completed_at is a max() read
+        # off ix_task_goal_id_completed_at
+        totals = {}
+        for goal_id, tasks, completed in changes:
+            if goal_id:
+                total = totals.setdefault(goal_id, [0, 0])
+                total[0] += tasks
+                total[1] += completed
+        if not totals:
+            return
+
+        from .task import Task
+        goal_ids = sorted(totals)
+        db.session.flush()
+        if db.engine.dialect.name == "postgresql":
+            # wait for any other transaction touching these goals first, so
+            # the max() snapshot already includes its tasks
+            db.session.query(cls.goal_id).filter(
+                cls.goal_id.in_(goal_ids)
+            ).order_by(cls.goal_id).with_for_update().all()
+
+        values = {
+            cls.last_completed_at: db.select([db.func.max(Task.completed_at)]).where(
+                Task.goal_id == cls.goal_id).as_scalar(),
+            cls.change_seq: TableVersion.next_change_seq(),
+        }
+        for index, column in enumerate((cls.task_count, cls.completed_count)):
+            deltas = {
+                goal_id: total[index] for goal_id, total in totals.items()
+                if total[index]
+            }
+            if deltas:
+                values[column] = column + db.case(deltas, value=cls.goal_id, else_=0)
+
+        cls.query.filter(cls.goal_id.in_(goal_ids)).update(
+            values, synchronize_session=False)
+
     @classmethod
     def from_dict(cls, data):
         return Goal(
@@ -0,0 +1,34 @@
+import datetime
+from app import db
+
+
+class ImportJob(db.Model):
+    import_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String, nullable=False, default="running")
+    format = db.Column(db.String, nullable=False)
+    # records of the upload consumed by committed batches, imported or
+    # rejected; a resumed upload skips this many
+    rows_read = db.Column(db.Integer, nullable=False, default=0)
+    rows_imported = db.Column(db.Integer, nullable=False, default=0)
+    rows_rejected = db.Column(db.Integer, nullable=False, default=0)
+    # the first IMPORT_MAX_ERRORS rejections, as {"row", "details"}
+    errors = db.Column(db.JSON, nullable=False, default=list)
+    details = db.Column(db.String, nullable=True)
+    created_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    updated_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+
+    def to_dict(self):
+        return dict(
+            id=self.import_id,
+            status=self.status,
+            format=self.format,
+            rows_read=self.rows_read,
+            rows_imported=self.rows_imported,
+            rows_rejected=self.rows_rejected,
+            errors=self.errors,
+            details=self.details,
+            created_at=self.created_at.isoformat(),
+            updated_at=self.updated_at.isoformat(),
+        )
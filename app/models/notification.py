@@ -0,0 +1,17 @@
+import datetime
+from app import db
+
+
+class Notification(db.Model):
+    notification_id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String, nullable=False)
+    text = db.Column(db.String, nullable=False)
+    created_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.datetime.utcnow)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # NULL once the row is sent or has exhausted its attempts, so the
+    # worker's "due" scan only ever walks pending rows in this index
+    next_attempt_at = db.Column(
+        db.DateTime, nullable=True, index=True, default=datetime.datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String, nullable=True)
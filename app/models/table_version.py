@@ -0,0 +1,84 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import Session
+from app import db
+
+CHANGES = "changes"
+
+
+class TableVersion(db.Model):
+    name = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def bump(cls, *names):
+        # runs in the caller's transaction, so the new version becomes
+        # visible exactly when the change it describes commits; a table
+        # already bumped with the transaction's change_seq isn't bumped again
+        bumped = db.session.info.setdefault("bumped_versions", set())
+        for name in names:
+            if name in bumped:
+                continue
+            bumped.add(name)
+            updated = cls.query.filter_by(name=name).update(
+                {cls.version: cls.version + 1}, synchronize_session=False)
+            if not updated:
+                db.session.add(cls(name=name, version=1))
+
+    @classmethod
+    def current(cls, *names):
+        versions = dict(
+            db.session.query(cls.name, cls.version).filter(cls.name.in_(names)))
+        return [(name, versions.get(name, 0)) for name in names]
+
+    @classmethod
+    def next_change_seq(cls, *names):
+        # one number per write transaction, taken from the "changes" row.
+        # That row stays locked until commit, so numbers become visible in
+        # commit order and a reader that has seen N can never miss a later
+        # commit numbered below N. The price is that writers run one at a
+        # time from here to commit, so routes take it at their first write
+        # and the ceiling is 1 / that hold time; an import batch holds it
+        # for its whole COPY. benchmarks/change_seq.py measures both.
+        # `names` are the tables the transaction writes: their versions
+        # move in the same UPDATE, so a write pays one statement for both
+        seq = db.session.info.get("change_seq")
+        if seq is not None:
+            cls.bump(*names)
+            return seq
+
+        wanted = [CHANGES, *names]
+        table = cls.__table__
+        update = table.update().where(table.c.name.in_(wanted)).values(
+            version=table.c.version + 1)
+        if db.engine.dialect.name == "postgresql":
+            versions = dict(db.session.execute(
+                update.returning(table.c.name, table.c.version)).fetchall())
+        elif db.session.execute(update).rowcount:
+            versions = dict(db.session.query(cls.name, cls.version).filter(
+                cls.name.in_(wanted)))
+        else:
+            versions = {}
+
+        for name in wanted:
+            if name not in versions:
+                versions[name] = 1
+                db.session.add(cls(name=name, version=1))
+
+        seq = versions[CHANGES]
+        db.session.info["change_seq"] = seq
+        db.session.info["bumped_versions"] = set(names)
+        return seq
+
+
+# create_all seeds the rows the migrations insert, so a fresh database
+# writes through the same UPDATEs as a migrated one
+event.listen(TableVersion.__table__, "after_create", DDL(
+    "INSERT INTO table_version (name, version) "
+    f"VALUES ('task', 0), ('goal', 0), ('{CHANGES}', 0)"))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_change_seq(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("change_seq", None)
+        session.info.pop("bumped_versions", None)
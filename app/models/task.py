@@ -1,3 +1,4 @@
+from sqlalchemy import DDL, event
 from app import db
 
 
@@ -7,28 +8,110 @@ class Task(db.Model):
     description = db.Column(db.String, nullable=False)
     completed_at = db.Column(db.DateTime, nullable=True)
     goal_id = db.Column(db.Integer, db.ForeignKey("goal.goal_id"))
+    # the change feed position of the transaction that last wrote the row
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0")
     goal = db.relationship("Goal", back_populates="tasks")
 
+    # title/goal_id indexes carry task_id so keyset pages and a goal's
+    # ordered task list are read straight off the index
+    __table_args__ = (
+        db.Index("ix_task_title_task_id", "title", "task_id"),
+        db.Index("ix_task_goal_id_task_id", "goal_id", "task_id"),
+        db.Index("ix_task_completed_at", "completed_at"),
+        # serves the last_completed_at max() in Goal.apply_counter_deltas
+        # and the full recount in counters reconcile
+        db.Index("ix_task_goal_id_completed_at", "goal_id", "completed_at"),
+        db.Index("ix_task_change_seq_task_id", "change_seq", "task_id"),
+    )
+
 
     def is_complete(self):
         return self.completed_at is not None
 
-    def to_dict(self):
+    @classmethod
+    def row_columns(cls):
+        return (cls.task_id, cls.title, cls.description, cls.completed_at, cls.goal_id)
+
+    @staticmethod
+    def row_to_dict(row):
+        # shared by to_dict and the read routes that select row_columns()
+        # as plain tuples, so both paths serialize identically
+        task_id, title, description, completed_at, goal_id = row
         data = dict(
-            id=self.task_id,
-            title=self.title,
-            description=self.description,
-            is_complete=self.is_complete(),
+            id=task_id,
+            title=title,
+            description=description,
+            is_complete=completed_at is not None,
         )
 
-        if self.goal_id:
-            data["goal_id"] = self.goal_id
+        if goal_id:
+            data["goal_id"] = goal_id
 
         return data
+
+    def to_dict(self):
+        return self.row_to_dict((
+            self.task_id, self.title, self.description, self.completed_at, self.goal_id))
     
     @classmethod
-    def from_dict(cls, data):
-        return Task(
+    def row_from_dict(cls, data):
+        row = dict(
             title=data["title"],
             description=data["description"],
-        )
\ No newline at end of file
+        )
+
+        if any(value is None for value in row.values()):
+            raise KeyError
+
+        return row
+
+    @classmethod
+    def from_dict(cls, data):
+        return Task(**cls.row_from_dict(data))
+
+
+# LIKE 'prefix%' can only use a pattern_ops index on Postgres (unless the
+# database collation is C); SQLite serves title prefixes from
+# ix_task_title_task_id with a range predicate instead
+event.listen(Task.__table__, "after_create", DDL(
+    "CREATE INDEX ix_task_title_pattern ON task (title varchar_pattern_ops, task_id)"
+).execute_if(dialect="postgresql"))
+
+# Postgres indexes a tsvector expression over task, so no column has to be
+# added or backfilled; search_tasks must query this exact expression for
+# the planner to use the index. Title matches are weighted above
+# description matches
+POSTGRES_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('english', task.title), 'A') || "
+    "setweight(to_tsvector('english', task.description), 'B'))")
+POSTGRES_SEARCH_DDL = [
+    f"CREATE INDEX ix_task_search_vector ON task USING GIN ({POSTGRES_SEARCH_VECTOR})",
+]
+
+# SQLite gets an external-content FTS5 table over task, kept in step by
+# triggers so every write path (ORM, bulk inserts, UPDATEs) maintains it
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE task_fts USING fts5("
+    "title, description, content='task', content_rowid='task_id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts (rowid, title, description) "
+    "VALUES (new.task_id, new.title, new.description); END",
+    "CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts (task_fts, rowid, title, description) "
+    "VALUES ('delete', old.task_id, old.title, old.description); END",
+    "CREATE TRIGGER task_fts_update AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts (task_fts, rowid, title, description) "
+    "VALUES ('delete', old.task_id, old.title, old.description); "
+    "INSERT INTO task_fts (rowid, title, description) "
+    "VALUES (new.task_id, new.title, new.description); END",
+]
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create",
+                 DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Task.__table__, "after_create",
+                 DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS task_fts").execute_if(dialect="sqlite"))
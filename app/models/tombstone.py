@@ -0,0 +1,17 @@
+from app import db
+
+
+class Tombstone(db.Model):
+    # what the change feed reports for a deleted task or goal
+    tombstone_id = db.Column(db.Integer, primary_key=True)
+    change_seq = db.Column(db.BigInteger, nullable=False, index=True)
+    kind = db.Column(db.String, nullable=False)
+    object_id = db.Column(db.Integer, nullable=False)
+
+    @classmethod
+    def record(cls, kind, object_ids, change_seq):
+        if object_ids:
+            db.session.execute(cls.__table__.insert(), [
+                dict(change_seq=change_seq, kind=kind, object_id=object_id)
+                for object_id in object_ids
+            ])
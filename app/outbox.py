@@ -0,0 +1,215 @@
+import datetime
+import time
+from collections import OrderedDict
+import click
+import requests
+from flask import current_app
+from flask.cli import AppGroup
+from requests.adapters import HTTPAdapter
+from app import db
+from .instrumentation import external_call
+from .metrics import get_metrics
+from .models.notification import Notification
+
+MAX_MESSAGE_LENGTH = 4000
+
+outbox_cli = AppGroup("outbox", help="Deliver queued Slack notifications.")
+
+
+class SlackError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SlackClient:
+    def __init__(self, api_url, token, timeout=5, pool_size=4):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config["SLACK_API_URL"],
+            config["SLACK_BOT_TOKEN"],
+            timeout=config["SLACK_TIMEOUT"],
+        )
+
+    def post_message(self, channel, text):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with external_call():
+                response = self.session.post(
+                    self.api_url,
+                    data=dict(channel=channel, text=text),
+                    timeout=self.timeout,
+                )
+            status = str(response.status_code)
+        except requests.RequestException as error:
+            raise SlackError(str(error))
+        finally:
+            metrics = get_metrics()
+            if metrics is not None:
+                metrics.observe("slack_request_duration_seconds",
+                                time.perf_counter() - start, dict(status=status))
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise SlackError(
+                f"HTTP {response.status_code}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code >= 400:
+            raise SlackError(f"HTTP {response.status_code}")
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if body.get("ok") is False:
+            raise SlackError(body.get("error", "unknown error"))
+
+    def close(self):
+        self.session.close()
+
+
+def parse_retry_after(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def enqueue(channel, text):
+    # added to the caller's session so the row commits (or rolls back)
+    # together with the change it reports
+    db.session.add(Notification(channel=channel, text=text))
+
+
+def backoff(attempts, config):
+    delay = config["OUTBOX_BACKOFF_BASE"] * 2 ** (attempts - 1)
+    return min(delay, config["OUTBOX_BACKOFF_MAX"])
+
+
+def merge(notifications):
+    # one message per channel per batch, split only to stay under Slack's
+    # message size limit
+    groups = OrderedDict()
+    for notification in notifications:
+        groups.setdefault(notification.channel, []).append(notification)
+
+    for channel, group in groups.items():
+        chunk, length = [], 0
+        for notification in group:
+            if chunk and length + len(notification.text) + 1 > MAX_MESSAGE_LENGTH:
+                yield channel, chunk
+                chunk, length = [], 0
+            chunk.append(notification)
+            length += len(notification.text) + 1
+        yield channel, chunk
+
+
+def drain_batch(client, config=None):
+    config = config or current_app.config
+    now = datetime.datetime.utcnow()
+
+    notifications = (
+        Notification.query
+        .filter(Notification.next_attempt_at <= now)
+        .order_by(Notification.notification_id)
+        .limit(config["OUTBOX_BATCH_SIZE"])
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    result = dict(sent=0, retried=0, failed=0, retry_after=None)
+    rate_limited = False
+
+    for channel, group in merge(notifications):
+        if rate_limited:
+            break
+
+        try:
+            client.post_message(channel, "\n".join(n.text for n in group))
+        except SlackError as error:
+            for notification in group:
+                notification.attempts += 1
+                notification.last_error = str(error)[:500]
+                if notification.attempts >= config["OUTBOX_MAX_ATTEMPTS"]:
+                    notification.next_attempt_at = None
+                    result["failed"] += 1
+                else:
+                    delay = max(
+                        backoff(notification.attempts, config),
+                        error.retry_after or 0,
+                    )
+                    notification.next_attempt_at = now + \
+                        datetime.timedelta(seconds=delay)
+                    result["retried"] += 1
+
+            if error.retry_after is not None:
+                # the rest of the batch would only hit the same limit
+                rate_limited = True
+                result["retry_after"] = error.retry_after
+        else:
+            for notification in group:
+                notification.attempts += 1
+                notification.sent_at = now
+                notification.next_attempt_at = None
+                notification.last_error = None
+            result["sent"] += len(group)
+
+    db.session.commit()
+
+    result["fetched"] = len(notifications)
+    return result
+
+
+def drain(client, config=None):
+    config = config or current_app.config
+    totals = dict(sent=0, retried=0, failed=0, retry_after=None)
+
+    while True:
+        result = drain_batch(client, config)
+        for key in ("sent", "retried", "failed"):
+            totals[key] += result[key]
+        totals["retry_after"] = result["retry_after"]
+
+        if result["retry_after"] is not None:
+            break
+        if result["fetched"] < config["OUTBOX_BATCH_SIZE"]:
+            break
+
+    return totals
+
+
+@outbox_cli.command("drain")
+@click.option("--watch", is_flag=True, help="Keep polling for new notifications.")
+@click.option("--interval", default=1.0, show_default=True,
+              help="Seconds between polls when watching.")
+def drain_command(watch, interval):
+    config = current_app.config
+    if not config["SLACK_BOT_TOKEN"]:
+        raise click.ClickException("SLACK_BOT_TOKEN is not set")
+
+    client = SlackClient.from_config(config)
+    try:
+        while True:
+            totals = drain(client, config)
+            metrics = get_metrics()
+            if metrics is not None:
+                metrics.flush()
+            click.echo(
+                f"sent={totals['sent']} retried={totals['retried']} "
+                f"failed={totals['failed']}"
+            )
+            if not watch:
+                break
+            time.sleep(max(interval, totals["retry_after"] or 0))
+    finally:
+        client.close()
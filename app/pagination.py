@@ -0,0 +1,82 @@
+import base64
+import json
+from flask import abort, current_app, jsonify, make_response, request
+from sqlalchemy import tuple_
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, keys):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        abort(make_response(dict(details="Invalid cursor"), 400))
+
+    for key, value in zip(keys, values):
+        if type(value) is not key.type.python_type:
+            abort(make_response(dict(details="Invalid cursor"), 400))
+
+    return values
+
+
+def page_size(default=None):
+    max_size = current_app.config["MAX_PAGE_SIZE"]
+    limit = request.args.get("limit")
+
+    if limit is None:
+        return min(default or max_size, max_size)
+
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+
+    if limit < 1:
+        abort(make_response(dict(details="Invalid limit"), 400))
+
+    return min(limit, max_size)
+
+
+def paginate(query, keys, descending=False):
+    # keys must end with the primary key so the ordering is total; seeking
+    # past the previous page's last key keeps every page an index range scan
+    limit = page_size()
+    cursor = request.args.get("cursor")
+
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        position = tuple_(*keys) if len(keys) > 1 else keys[0]
+        bound = tuple_(*values) if len(values) > 1 else values[0]
+        query = query.filter(position < bound if descending else position > bound)
+
+    order = [key.desc() for key in keys] if descending else keys
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], key.key) for key in keys])
+
+    return rows, next_cursor
+
+
+def page_response(name, items, next_cursor):
+    # explicit pagination gets an envelope; plain list requests keep the
+    # bare array they always got, capped at MAX_PAGE_SIZE
+    if "limit" in request.args or "cursor" in request.args:
+        response = make_response({name: items, "next_cursor": next_cursor})
+    else:
+        response = make_response(jsonify(items))
+
+    if next_cursor:
+        response.headers["Next-Cursor"] = next_cursor
+
+    return response
+
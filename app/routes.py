@@ -1,55 +1,118 @@
 import datetime
-import os
-from flask import Blueprint, jsonify, abort, make_response, request
+from flask import Blueprint, Response, abort, current_app, g, jsonify, make_response, request
+from sqlalchemy.orm import joinedload
 from app import db
 from .models.task import Task
 from .models.goal import Goal
-import requests
-
-SLACK_API_URL = "https://slack.com/api/chat.postMessage"
-SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
+from .models.table_version import CHANGES, TableVersion
+from .models.tombstone import Tombstone
+from .bulk import delete_returning, insert_returning_ids, parse_ndjson, update_returning
+from .cache import cache_key, get_cache
+from .changes import read_changes
+from .database import pool_status
+from .etag import versioned
+from .events import get_broker, record_event, stream_events
+from .export import export_goals, export_tasks
+from .importer import get_import, import_tasks
+from .filters import FILTERS, filter_tasks, task_criteria
+from .outbox import enqueue
+from .pagination import page_size, paginate, page_response
+from .search import search_tasks
+from .streaming import stream_json_array
+
+MAX_NOTIFIED_TITLES = 20
 
 task_bp = Blueprint("task", __name__, url_prefix="/tasks")
 goal_bp = Blueprint("goal", __name__, url_prefix="/goals")
-
-def notify_complete(task):
-    if not SLACK_BOT_TOKEN:
+stats_bp = Blueprint("stats", __name__, url_prefix="/stats")
+metrics_bp = Blueprint("metrics", __name__)
+changes_bp = Blueprint("changes", __name__, url_prefix="/changes")
+events_bp = Blueprint("events", __name__, url_prefix="/events")
+export_bp = Blueprint("export", __name__, url_prefix="/export")
+import_bp = Blueprint("import", __name__, url_prefix="/import")
+
+def notify_complete(titles):
+    if not current_app.config["SLACK_BOT_TOKEN"] or not titles:
         return
-    
-    headers = {
-        "Authorization": f"Bearer {SLACK_BOT_TOKEN}",
-    }
 
-    data = {
-        "channel": "task-notifications-demo",
-        "text": f'Task "{task.title}" has been marked complete',
-    }
+    if len(titles) == 1:
+        text = f'Task "{titles[0]}" has been marked complete'
+    else:
+        # one summary row for the whole batch, kept well under Slack's limit
+        text = f"{len(titles)} tasks have been marked complete: " + ", ".join(
+            f'"{title}"' for title in titles[:MAX_NOTIFIED_TITLES])
+        if len(titles) > MAX_NOTIFIED_TITLES:
+            text += f" and {len(titles) - MAX_NOTIFIED_TITLES} more"
 
-    requests.post(SLACK_API_URL, headers=headers, data=data)
+    enqueue(current_app.config["SLACK_CHANNEL"], text)
+
+def parse_id(kind, object_id):
+    # ids are integers; anything else can't match a row, so it never
+    # reaches the database
+    try:
+        return int(object_id)
+    except ValueError:
+        abort(make_response(dict(
+            details=f"Unknown {kind} id: {object_id}"
+        ), 404))
 
 @task_bp.route("", methods=["GET"])
+@versioned("task")
 def task_index():
     sort_dir = request.args.get("sort")
-
-    if sort_dir == "asc":
-        tasks = Task.query.order_by(Task.title).all()
-    elif sort_dir == "desc":
-        tasks = Task.query.order_by(Task.title.desc()).all()
+    # read-only: plain column tuples skip ORM instances and the identity map
+    query = filter_tasks(db.session.query(*Task.row_columns()), request.args)
+
+    if request.args.get("stream") == "1":
+        if sort_dir == "asc":
+            query = query.order_by(Task.title, Task.task_id)
+        elif sort_dir == "desc":
+            query = query.order_by(Task.title.desc(), Task.task_id.desc())
+        else:
+            query = query.order_by(Task.task_id)
+
+        return stream_json_array(query, Task.row_to_dict)
+
+    if sort_dir in ("asc", "desc"):
+        rows, next_cursor = paginate(
+            query, [Task.title, Task.task_id], descending=sort_dir == "desc")
     else:
-        tasks = Task.query.all()
+        rows, next_cursor = paginate(query, [Task.task_id])
+
+    return page_response("tasks", [Task.row_to_dict(row) for row in rows], next_cursor)
 
-    return jsonify([task.to_dict() for task in tasks])
+@task_bp.route("/search", methods=["GET"])
+@versioned("task")
+def search_task_index():
+    q = request.args.get("q", "").strip()
+    if not q:
+        abort(make_response(dict(details="Invalid q"), 400))
+
+    query = filter_tasks(db.session.query(*Task.row_columns()), request.args)
+    rows = search_tasks(query, q).limit(page_size(default=50)).all()
+
+    return dict(tasks=[Task.row_to_dict(row) for row in rows])
 
 @task_bp.route("/<task_id>", methods=["GET"])
+@versioned("task")
 def get_one_task(task_id):
-    task = Task.query.get(task_id)
+    key = cache_key("task", task_id)
+    version = g.table_versions["task"]
+    payload = get_cache().get(key, version) if key else None
 
-    if not task:
-        abort(make_response(dict(
-            details=f"Unknown Task id: {task_id}"
-        ), 404))
+    if payload is None:
+        row = db.session.query(*Task.row_columns()).filter(
+            Task.task_id == int(task_id)).first() if key else None
 
-    return dict(task=task.to_dict())
+        if not row:
+            abort(make_response(dict(
+                details=f"Unknown Task id: {task_id}"
+            ), 404))
+
+        payload = Task.row_to_dict(row)
+        get_cache().set(key, payload, version)
+
+    return dict(task=payload)
 
 @task_bp.route("", methods=["POST"])
 def create_task():
@@ -60,93 +123,254 @@ def create_task():
     except KeyError:
         abort(make_response(dict(details="Invalid data"), 400))
 
+    task.change_seq = TableVersion.next_change_seq("task")
     db.session.add(task)
+    Goal.apply_counter_deltas([(task.goal_id, 1, int(task.is_complete()))])
+    db.session.flush()
+    record_event("task.create", task.to_dict())
     db.session.commit()
 
     return dict(task=task.to_dict()), 201
 
+@task_bp.route("/bulk", methods=["POST"])
+def create_tasks_bulk():
+    if request.mimetype == "application/x-ndjson":
+        items = parse_ndjson(request.stream)
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            abort(make_response(dict(details="Invalid data"), 400))
+
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(Task.row_from_dict(item))
+        except (KeyError, TypeError):
+            errors.append(dict(index=index, details="Invalid data"))
+
+    if errors:
+        abort(make_response(dict(details="Invalid data", errors=errors), 400))
+
+    change_seq = TableVersion.next_change_seq("task")
+    for row in rows:
+        row["change_seq"] = change_seq
+
+    task_ids = insert_returning_ids(
+        Task.__table__, rows, current_app.config["BULK_INSERT_BATCH_SIZE"])
+    record_event("task.bulk_create", dict(task_ids=task_ids))
+    db.session.commit()
+
+    return dict(task_ids=task_ids), 201
+
 @task_bp.route("/<task_id>", methods=["PUT"])
 def update_task(task_id):
+    task_id = parse_id("Task", task_id)
     data = request.get_json()
-    task = Task.query.get(task_id)
-
-    if not task:
-        abort(make_response(dict(
-            details=f"Unknown Task id: {task_id}"
-        ), 404))
 
     try:
-        task.title = data["title"]
-        task.description = data["description"]
+        values = dict(title=data["title"], description=data["description"])
     except KeyError:
         abort(make_response(dict(details="Invalid data"), 400))
 
+    # one UPDATE ... RETURNING both finds the row and gives back the
+    # response body, so nothing is re-read after the commit
+    row = update_task_row(task_id, values)
+
+    record_event("task.update", Task.row_to_dict(row))
     db.session.commit()
+    get_cache().delete(cache_key("task", task_id))
 
-    return dict(task=task.to_dict())
+    return dict(task=Task.row_to_dict(row))
 
 @task_bp.route("/<task_id>", methods=["DELETE"])
 def delete_task(task_id):
-    task = Task.query.get(task_id)
+    task_id = parse_id("Task", task_id)
+    change_seq = TableVersion.next_change_seq("task")
+    rows = delete_returning(
+        Task.__table__, Task.task_id == task_id,
+        [Task.title, Task.goal_id, Task.completed_at])
 
-    if not task:
+    if not rows:
         abort(make_response(dict(
             details=f"Unknown Task id: {task_id}"
         ), 404))
 
-    db.session.delete(task)
+    title, goal_id, completed_at = rows[0]
+    Tombstone.record("task", [task_id], change_seq)
+    Goal.apply_counter_deltas([(goal_id, -1, -int(completed_at is not None))])
+    record_event("task.delete", dict(id=task_id))
     db.session.commit()
+    get_cache().delete(cache_key("task", task_id))
 
-    return dict(details=f'Task {task.task_id} "{task.title}" successfully deleted')
+    return dict(details=f'Task {task_id} "{title}" successfully deleted')
 
 @task_bp.route("/<task_id>/mark_complete", methods=["PATCH"])
 def mark_complete(task_id):
-    task = Task.query.get(task_id)
-
-    if not task:
-        abort(make_response(dict(
-            details=f"Unknown Task id: {task_id}"
-        ), 404))
+    task_id = parse_id("Task", task_id)
+    *row, previous_completed_at = update_task_row(task_id, dict(
+        completed_at=datetime.datetime.now(datetime.timezone.utc)),
+        previous=[Task.completed_at])
 
-    task.completed_at = datetime.datetime.now(datetime.timezone.utc)
+    notify_complete([row[1]])
 
+    Goal.apply_counter_deltas([(row[4], 0, int(previous_completed_at is None))])
+    record_event("task.complete", Task.row_to_dict(row))
     db.session.commit()
+    get_cache().delete(cache_key("task", task_id))
 
-    notify_complete(task)
-
-    return dict(task=task.to_dict())
+    return dict(task=Task.row_to_dict(row))
 
 @task_bp.route("/<task_id>/mark_incomplete", methods=["PATCH"])
 def mark_incomplete(task_id):
-    task = Task.query.get(task_id)
+    task_id = parse_id("Task", task_id)
+    *row, previous_completed_at = update_task_row(
+        task_id, dict(completed_at=None), previous=[Task.completed_at])
+
+    Goal.apply_counter_deltas([(row[4], 0, -int(previous_completed_at is not None))])
+    record_event("task.incomplete", Task.row_to_dict(row))
+    db.session.commit()
+    get_cache().delete(cache_key("task", task_id))
+
+    return dict(task=Task.row_to_dict(row))
+
+def update_task_row(task_id, values, previous=()):
+    values = dict(values, change_seq=TableVersion.next_change_seq("task"))
+    rows = update_returning(
+        Task.__table__, Task.task_id == task_id, values, Task.row_columns(), previous)
 
-    if not task:
+    if not rows:
         abort(make_response(dict(
             details=f"Unknown Task id: {task_id}"
         ), 404))
 
-    task.completed_at = None
+    return rows[0]
 
-    db.session.commit()
+@task_bp.route("/mark_complete", methods=["PATCH"])
+def mark_many_complete():
+    return mark_many(datetime.datetime.now(datetime.timezone.utc))
+
+@task_bp.route("/mark_incomplete", methods=["PATCH"])
+def mark_many_incomplete():
+    return mark_many(None)
+
+def mark_many(completed_at):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(make_response(dict(details="Invalid data"), 400))
+
+    task_ids = None
+    if "task_ids" in data:
+        # JSON integers only: int() would truncate 2.7 to 2 and True to 1
+        if not isinstance(data["task_ids"], list) or \
+                any(type(task_id) is not int for task_id in data["task_ids"]):
+            abort(make_response(dict(details="Invalid data"), 400))
+        task_ids = list(dict.fromkeys(data["task_ids"]))
+        where = Task.task_id.in_(task_ids)
+    elif isinstance(data.get("filter"), dict) and data["filter"] and \
+            set(data["filter"]) <= set(FILTERS):
+        # same filters as GET /tasks; JSON true/false/null read like the
+        # query string spellings
+        args = {
+            name: str(value).lower() if value is None or isinstance(value, bool)
+            else str(value)
+            for name, value in data["filter"].items()
+        }
+        criteria = task_criteria(args)
+        # e.g. an empty title_prefix adds nothing, and an UPDATE with no
+        # WHERE would touch every task
+        if not criteria:
+            abort(make_response(dict(details="Invalid data"), 400))
+        where = db.and_(*criteria)
+    else:
+        abort(make_response(dict(details="Invalid data"), 400))
+
+    # one UPDATE for the whole set, whatever its size
+    rows = update_returning(
+        Task.__table__, where,
+        dict(completed_at=completed_at, change_seq=TableVersion.next_change_seq("task")),
+        [Task.task_id, Task.title, Task.goal_id], [Task.completed_at])
+    updated_ids = [task_id for task_id, _, _, _ in rows]
+
+    if completed_at:
+        notify_complete([title for _, title, _, _ in rows])
+
+    # every row ends up in the same state, so only the ones that were in
+    # the other state move completed_count
+    Goal.apply_counter_deltas(
+        (goal_id, 0, int(completed_at is not None) - int(previous is not None))
+        for _, _, goal_id, previous in rows)
+    if updated_ids:
+        record_event("task.complete_many" if completed_at else "task.incomplete_many",
+                     dict(task_ids=sorted(updated_ids)))
+        db.session.commit()
+        get_cache().delete(*(cache_key("task", task_id) for task_id in updated_ids))
+    else:
+        # nothing matched: rolling back hands the change_seq back, so the
+        # event stream never sees a number with no event behind it
+        db.session.rollback()
+
+    response = dict(task_ids=sorted(updated_ids))
+    if task_ids is not None:
+        found = set(updated_ids)
+        response["missing_ids"] = [
+            task_id for task_id in task_ids if task_id not in found]
 
-    return dict(task=task.to_dict())
+    return response
 
 @goal_bp.route("", methods=["GET"])
 def goal_index():
-    goals = Goal.query.all()
-
-    return jsonify([goal.to_dict() for goal in goals])
+    with_progress = request.args.get("with_progress") == "1"
+
+    if request.args.get("include") == "tasks":
+        # goals and their tasks come back from one joined SELECT per page
+        goals, next_cursor = paginate(
+            Goal.query.options(joinedload(Goal.tasks)), [Goal.goal_id])
+        items = []
+        for goal in goals:
+            item = goal_with_tasks(goal)
+            if with_progress:
+                item.update(Goal.progress_to_dict(
+                    (goal.task_count, goal.completed_count, goal.last_completed_at)))
+            items.append(item)
+        return page_response("goals", items, next_cursor)
+
+    if with_progress:
+        # the counters live on goal, so progress costs no join or GROUP BY
+        rows, next_cursor = paginate(
+            db.session.query(*Goal.row_columns(), *Goal.progress_columns()),
+            [Goal.goal_id])
+        items = [
+            dict(Goal.row_to_dict(row[:2]), **Goal.progress_to_dict(row[2:]))
+            for row in rows
+        ]
+        return page_response("goals", items, next_cursor)
+
+    rows, next_cursor = paginate(
+        db.session.query(*Goal.row_columns()), [Goal.goal_id])
+
+    return page_response("goals", [Goal.row_to_dict(row) for row in rows], next_cursor)
 
 @goal_bp.route("/<goal_id>", methods=["GET"])
+@versioned("goal")
 def get_one_goal(goal_id):
-    goal = Goal.query.get(goal_id)
+    key = cache_key("goal", goal_id)
+    version = g.table_versions["goal"]
+    payload = get_cache().get(key, version) if key else None
 
-    if not goal:
-        abort(make_response(dict(
-            details=f"Unknown Goal id: {goal_id}"
-        ), 404))
+    if payload is None:
+        row = db.session.query(*Goal.row_columns()).filter(
+            Goal.goal_id == int(goal_id)).first() if key else None
+
+        if not row:
+            abort(make_response(dict(
+                details=f"Unknown Goal id: {goal_id}"
+            ), 404))
+
+        payload = Goal.row_to_dict(row)
+        get_cache().set(key, payload, version)
 
-    return dict(goal=goal.to_dict())
+    return dict(goal=payload)
 
 @goal_bp.route("", methods=["POST"])
 def create_goal():
@@ -157,43 +381,63 @@ def create_goal():
     except KeyError:
         abort(make_response(dict(details="Invalid data"), 400))
 
+    goal.change_seq = TableVersion.next_change_seq("goal")
     db.session.add(goal)
+    db.session.flush()
+    record_event("goal.create", goal.to_dict())
     db.session.commit()
 
     return dict(goal=goal.to_dict()), 201
 
 @goal_bp.route("/<goal_id>", methods=["PUT"])
 def update_goal(goal_id):
+    goal_id = parse_id("Goal", goal_id)
     data = request.get_json()
-    goal = Goal.query.get(goal_id)
-
-    if not goal:
-        abort(make_response(dict(
-            details=f"Unknown Goal id: {goal_id}"
-        ), 404))
 
     try:
-        goal.title = data["title"]
+        values = dict(title=data["title"], change_seq=TableVersion.next_change_seq("goal"))
     except KeyError:
         abort(make_response(dict(details="Invalid data"), 400))
 
+    rows = update_returning(
+        Goal.__table__, Goal.goal_id == goal_id, values, Goal.row_columns())
+
+    if not rows:
+        abort(make_response(dict(
+            details=f"Unknown Goal id: {goal_id}"
+        ), 404))
+
+    record_event("goal.update", Goal.row_to_dict(rows[0]))
     db.session.commit()
+    get_cache().delete(cache_key("goal", goal_id))
 
-    return dict(goal=goal.to_dict())
+    return dict(goal=Goal.row_to_dict(rows[0]))
 
 @goal_bp.route("/<goal_id>", methods=["DELETE"])
 def delete_goal(goal_id):
-    goal = Goal.query.get(goal_id)
+    goal_id = parse_id("Goal", goal_id)
 
-    if not goal:
+    # tasks are detached first so the foreign key never sees a dangling
+    # goal; the ids that come back are the cached payloads that change
+    change_seq = TableVersion.next_change_seq("goal", "task")
+    detached = update_returning(
+        Task.__table__, Task.goal_id == goal_id,
+        dict(goal_id=None, change_seq=change_seq), [Task.task_id])
+    rows = delete_returning(Goal.__table__, Goal.goal_id == goal_id, [Goal.title])
+
+    if not rows:
         abort(make_response(dict(
             details=f"Unknown Goal id: {goal_id}"
         ), 404))
 
-    db.session.delete(goal)
+    Tombstone.record("goal", [goal_id], change_seq)
+    record_event("goal.delete", dict(
+        id=goal_id, detached_task_ids=[task_id for (task_id,) in detached]))
     db.session.commit()
+    get_cache().delete(cache_key("goal", goal_id), *(
+        cache_key("task", task_id) for (task_id,) in detached))
 
-    return dict(details=f'Goal {goal.goal_id} "{goal.title}" successfully deleted')
+    return dict(details=f'Goal {goal_id} "{rows[0][0]}" successfully deleted')
 
 @goal_bp.route("/<goal_id>/tasks", methods=["POST"])
 def set_goal_tasks(goal_id):
@@ -206,33 +450,173 @@ def set_goal_tasks(goal_id):
         ), 404))
 
     try:
-        task_ids = data["task_ids"]
-        tasks = []
-        for task_id in task_ids:
-            task = Task.query.get(task_id)
-            if not task:
-                abort(make_response(dict(details=f"Unknown Task id: {task_id}"), 404))
-            tasks.append(task)
-
-        goal.tasks = tasks
-    except KeyError:
+        requested = list(data["task_ids"])
+    except (KeyError, TypeError):
         abort(make_response(dict(details="Invalid data"), 400))
 
+    # an id that isn't an integer can't match a task, so it is reported
+    # with the unknown ones rather than rejected as bad data
+    # like a Task id in a URL, a string of digits counts; floats and bools
+    # would be truncated by int(), so they can't match a task either
+    parsed = []
+    for task_id in requested:
+        if type(task_id) is int:
+            parsed.append((task_id, task_id))
+        elif isinstance(task_id, str) and task_id.isdecimal():
+            parsed.append((task_id, int(task_id)))
+        else:
+            parsed.append((task_id, None))
+    task_ids = [number for _, number in parsed if number is not None]
+
+    found = {
+        task_id for (task_id,) in
+        db.session.query(Task.task_id).filter(Task.task_id.in_(task_ids))
+    }
+    missing = list(dict.fromkeys(
+        str(task_id) for task_id, number in parsed if number not in found))
+
+    if len(missing) == 1:
+        abort(make_response(dict(details=f"Unknown Task id: {missing[0]}"), 404))
+    elif missing:
+        abort(make_response(dict(details=f"Unknown Task ids: {', '.join(missing)}"), 404))
+
+    goal_id = goal.goal_id
+    change_seq = TableVersion.next_change_seq("task")
+    detached = update_returning(
+        Task.__table__,
+        db.and_(Task.goal_id == goal_id, Task.task_id.notin_(task_ids)),
+        dict(goal_id=None, change_seq=change_seq), [Task.task_id, Task.completed_at])
+    # the goals these tasks leave come back with them, so each counter
+    # moves by exactly the tasks it gained or lost
+    attached = update_returning(
+        Task.__table__, Task.task_id.in_(task_ids),
+        dict(goal_id=goal_id, change_seq=change_seq),
+        [Task.completed_at], [Task.goal_id])
+    detached_ids = [task_id for task_id, _ in detached]
+
+    changes = []
+    for _, completed_at in detached:
+        changes.append((goal_id, -1, -int(completed_at is not None)))
+    for completed_at, previous_goal_id in attached:
+        if previous_goal_id != goal_id:
+            completed = int(completed_at is not None)
+            changes += [(previous_goal_id, -1, -completed), (goal_id, 1, completed)]
+    Goal.apply_counter_deltas(changes)
+    record_event("goal.tasks_set", dict(
+        id=goal_id, task_ids=task_ids, detached_task_ids=detached_ids))
     db.session.commit()
+    get_cache().delete(*(
+        cache_key("task", task_id) for task_id in detached_ids + task_ids))
+
+    return dict(id=goal_id, task_ids=task_ids)
 
-    return dict(id=goal.goal_id, task_ids=[task.task_id for task in tasks])
+@goal_bp.route("/<goal_id>/progress", methods=["GET"])
+@versioned("goal", "task")
+def get_goal_progress(goal_id):
+    row = db.session.query(Goal.goal_id, *Goal.progress_columns()).filter(
+        Goal.goal_id == parse_id("Goal", goal_id)).first()
+
+    if not row:
+        abort(make_response(dict(
+            details=f"Unknown Goal id: {goal_id}"
+        ), 404))
+
+    return dict(id=row[0], **Goal.progress_to_dict(row[1:]))
 
 @goal_bp.route("/<goal_id>/tasks", methods=["GET"])
+@versioned("goal", "task")
 def get_goal_tasks(goal_id):
-    goal = Goal.query.get(goal_id)
+    goal = Goal.query.options(joinedload(Goal.tasks)).get(goal_id)
 
     if not goal:
         abort(make_response(dict(
             details=f"Unknown Goal id: {goal_id}"
         ), 404))
 
+    return goal_with_tasks(goal)
+
+def goal_with_tasks(goal):
     response = goal.to_dict()
-    tasks = goal.tasks
-    response["tasks"] = [task.to_dict() for task in tasks]
+    response["tasks"] = [task.to_dict() for task in goal.tasks]
 
     return response
+
+@changes_bp.route("", methods=["GET"])
+@versioned("task", "goal")
+def change_index():
+    # a client pages with next_cursor until it is null, then keeps
+    # last_seq and asks for since=last_seq next time
+    return read_changes()
+
+@events_bp.route("", methods=["GET"])
+def event_stream():
+    # browsers resend the id of the last event they saw when reconnecting
+    last_event_id = request.headers.get("Last-Event-ID")
+    last_seq = None
+    if last_event_id:
+        try:
+            last_seq = int(last_event_id)
+        except ValueError:
+            last_seq = -1
+        if last_seq < 0:
+            abort(make_response(dict(details="Invalid Last-Event-ID"), 400))
+
+    [(_, current_seq)] = TableVersion.current(CHANGES)
+    subscription, backlog, covered = get_broker().subscribe(last_seq, current_seq)
+    # the stream can stay open for hours; it must not hold a connection
+    db.session.remove()
+
+    response = Response(stream_events(
+        subscription, backlog, current_app.config["EVENTS_KEEPALIVE"],
+        reset=None if covered else (last_seq, current_seq),
+    ), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@export_bp.route("/tasks", methods=["GET"])
+def export_task_rows():
+    # updated_since takes a change_seq, e.g. the previous export's
+    # X-Last-Seq; deletions come from /changes
+    return export_tasks()
+
+@export_bp.route("/goals", methods=["GET"])
+def export_goal_rows():
+    return export_goals()
+
+@import_bp.route("/tasks", methods=["POST"])
+def import_task_rows():
+    # a failed import is resumed by uploading the same file again with
+    # ?import_id=<id>; the rows it already committed are skipped
+    return import_tasks()
+
+@import_bp.route("/tasks/<import_id>", methods=["GET"])
+def get_task_import(import_id):
+    return get_import(import_id)
+
+@stats_bp.route("/cache", methods=["GET"])
+def cache_stats():
+    # every worker keeps its own counts; the metrics files add them up
+    totals = current_app.extensions["metrics"].counter_totals(
+        "cache_hits_total", "cache_misses_total", "cache_evictions_total")
+    return dict(
+        hits=int(totals["cache_hits_total"]),
+        misses=int(totals["cache_misses_total"]),
+        evictions=int(totals["cache_evictions_total"]),
+    )
+
+@stats_bp.route("/pool", methods=["GET"])
+def pool_stats():
+    return pool_status(db.engine)
+
+@stats_bp.route("/slow_queries", methods=["GET"])
+def slow_query_stats():
+    slow_queries = current_app.extensions.get("slow_queries")
+    return jsonify(slow_queries.to_list() if slow_queries else [])
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(
+        current_app.extensions["metrics"].render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
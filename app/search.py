@@ -0,0 +1,28 @@
+from sqlalchemy import column, func, literal_column, table
+from app import db
+from .models.task import POSTGRES_SEARCH_VECTOR, Task
+
+task_fts = table("task_fts", column("rowid"))
+
+
+def fts5_query(q):
+    # quote every term so user input can't reach FTS5's query syntax;
+    # adjacent quoted terms are ANDed
+    terms = q.split()
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_tasks(query, q):
+    if db.engine.dialect.name == "postgresql":
+        vector = literal_column(POSTGRES_SEARCH_VECTOR)
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), q)
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            func.ts_rank(vector, tsquery).desc(), Task.task_id)
+
+    fts = literal_column("task_fts")
+    return (
+        query.join(task_fts, task_fts.c.rowid == Task.task_id)
+        .filter(fts.op("MATCH")(fts5_query(q)))
+        # bm25 is lower for better matches; title hits weigh 10x
+        .order_by(func.bm25(fts, 10.0, 1.0), Task.task_id)
+    )
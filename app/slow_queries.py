@@ -0,0 +1,218 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from flask import has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger("app.slow_queries")
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\?")
+IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+VALUES_ROW = re.compile(r"(\(\?(?:, \?)*\))(?:\s*,\s*\(\?(?:, \?)*\))+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(statement):
+    # literals and placeholders become ?, and IN lists and multi-row VALUES
+    # collapse, so the same call site always lands on the same fingerprint
+    normalized = STRING_LITERAL.sub("?", statement)
+    normalized = NUMBER_LITERAL.sub("?", normalized)
+    normalized = PLACEHOLDER.sub("?", normalized)
+    normalized = WHITESPACE.sub(" ", normalized).strip()
+    normalized = IN_LIST.sub("IN (...)", normalized)
+    return VALUES_ROW.sub(r"\1, ...", normalized)
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def param_shapes(parameters, executemany=False):
+    if executemany and parameters:
+        return dict(rows=len(parameters), row=param_shapes(parameters[0]))
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms, window=300, max_fingerprints=1000,
+                 explain=None, clock=time.monotonic):
+        self.threshold = threshold_ms / 1000
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        self.explain = explain
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers=1) if explain else None
+        self._lock = threading.Lock()
+
+    def record(self, statement, parameters, duration, endpoint=None,
+               executemany=False):
+        if duration < self.threshold:
+            return None
+
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        now = self.clock()
+
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            new = entry is None
+            if new:
+                entry = dict(
+                    fingerprint=key,
+                    sql=normalized,
+                    params=param_shapes(parameters, executemany),
+                    count=0,
+                    total_ms=0.0,
+                    max_ms=0.0,
+                    endpoints={},
+                    plan=None,
+                    recent=deque(),
+                    last_logged=None,
+                )
+            # most recently seen last, so the stalest fingerprint is evicted
+            self.entries[key] = entry
+            while len(self.entries) > self.max_fingerprints:
+                self.entries.popitem(last=False)
+
+            entry["count"] += 1
+            entry["total_ms"] += duration * 1000
+            entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+            endpoint = endpoint or "-"
+            entry["endpoints"][endpoint] = entry["endpoints"].get(endpoint, 0) + 1
+            entry["recent"].append(now)
+            while entry["recent"][0] < now - self.window:
+                entry["recent"].popleft()
+
+            # log a fingerprint once per window with its rolling count
+            # instead of once per execution
+            should_log = entry["last_logged"] is None or \
+                now - entry["last_logged"] >= self.window
+            if should_log:
+                entry["last_logged"] = now
+
+        if should_log:
+            logger.warning(json.dumps(dict(
+                event="slow_query",
+                fingerprint=key,
+                sql=normalized,
+                params=entry["params"],
+                endpoint=endpoint,
+                duration_ms=round(duration * 1000, 3),
+                count_in_window=len(entry["recent"]),
+                window_seconds=self.window,
+            )))
+
+        if new and self.executor is not None and not executemany:
+            entry["plan"] = "pending"
+            self.executor.submit(self.capture_plan, entry, statement, parameters)
+
+        return entry
+
+    def capture_plan(self, entry, statement, parameters):
+        try:
+            entry["plan"] = self.explain(statement, parameters)
+        except Exception as error:
+            entry["plan"] = None
+            logger.info(json.dumps(dict(
+                event="slow_query_explain_failed",
+                fingerprint=entry["fingerprint"],
+                error=str(error)[:500],
+            )))
+            return
+
+        logger.warning(json.dumps(dict(
+            event="slow_query_plan",
+            fingerprint=entry["fingerprint"],
+            plan=entry["plan"],
+        )))
+
+    def to_list(self):
+        now = self.clock()
+        with self._lock:
+            entries = list(self.entries.values())
+        result = []
+        for entry in entries:
+            result.append(dict(
+                fingerprint=entry["fingerprint"],
+                sql=entry["sql"],
+                params=entry["params"],
+                count=entry["count"],
+                count_in_window=sum(1 for seen in list(entry["recent"])
+                                    if seen >= now - self.window),
+                total_ms=round(entry["total_ms"], 3),
+                max_ms=round(entry["max_ms"], 3),
+                endpoints=dict(entry["endpoints"]),
+                plan=entry["plan"],
+            ))
+        return sorted(result, key=lambda entry: entry["total_ms"], reverse=True)
+
+
+def explain_plan(engine, statement, parameters):
+    # a raw DBAPI connection skips the engine events, so the EXPLAIN is
+    # neither timed nor explained itself
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("EXPLAIN " + statement, parameters)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        connection.rollback()
+        return plan
+    finally:
+        connection.close()
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint
+    return None
+
+
+def init_slow_query_log(app, engine):
+    threshold = app.config["SLOW_QUERY_THRESHOLD_MS"]
+    if not threshold:
+        return None
+
+    def explain(statement, parameters):
+        return explain_plan(engine, statement, parameters)
+
+    explains = app.config["SLOW_QUERY_EXPLAIN"] and engine.dialect.name == "postgresql"
+    slow_queries = SlowQueryLog(
+        threshold, window=app.config["SLOW_QUERY_WINDOW"],
+        explain=explain if explains else None)
+    app.extensions["slow_queries"] = slow_queries
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def check_query_time(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_query_started")
+        if not started:
+            return
+        slow_queries.record(
+            statement, parameters, time.perf_counter() - started.pop(),
+            current_endpoint(), executemany)
+
+    # a failed statement never reaches after_cursor_execute
+    @event.listens_for(engine, "handle_error")
+    def drop_query_timer(context):
+        if context.connection is None:
+            return
+        started = context.connection.info.get("slow_query_started")
+        if started:
+            started.pop()
+
+    return slow_queries
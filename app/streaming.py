@@ -0,0 +1,26 @@
+from flask import Response, current_app, json, stream_with_context
+
+
+def stream_json_array(query, serialize):
+    # psycopg2 turns stream_results into a named server-side cursor, so only
+    # one batch of rows is ever held in the worker at a time
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+    rows = query.execution_options(stream_results=True).yield_per(batch_size)
+
+    def generate():
+        separator = "["
+        chunk = []
+        for row in rows:
+            chunk.append(separator)
+            chunk.append(json.dumps(serialize(row), separators=(",", ":")))
+            separator = ","
+            if len(chunk) >= 2 * batch_size:
+                yield "".join(chunk)
+                chunk = []
+
+        if separator == "[":
+            chunk.append(separator)
+        chunk.append("]\n")
+        yield "".join(chunk)
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
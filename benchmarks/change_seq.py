@@ -0,0 +1,127 @@
+"""Write throughput under the change feed's sequence lock.
+
+    python -m benchmarks.change_seq --writers 8 --seconds 10 --import-rows 5000
+
+Every write transaction takes its change_seq from the one "changes" row of
+table_version and holds that row's lock until it commits (see
+TableVersion.next_change_seq), so writers run one at a time and the
+ceiling is 1 / (time from taking the seq to commit). This runs --writers
+threads doing PUT /tasks/<id>, first on their own and then next to a
+thread importing --import-rows rows per request, and reports the write
+rate and PUT latency of both phases.
+
+The target database (BENCHMARK_DATABASE_URI or --database) is dropped and
+reseeded like benchmarks.routes. SQLite serializes writers with its own
+database lock whatever the app does, so the numbers only describe the
+sequence lock on Postgres.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from benchmarks.routes import DEFAULT_DATABASE, percentile, seed
+
+
+def put_tasks(app, tasks, stop, latencies, errors):
+    client = app.test_client()
+    rng = random.Random()
+    while not stop.is_set():
+        task_id = rng.randint(1, tasks)
+        start = time.perf_counter()
+        response = client.put(
+            f"/tasks/{task_id}", json=dict(title=f"Updated {task_id}", description=""))
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+def import_tasks(app, rows, stop, imported):
+    client = app.test_client()
+    body = "".join(
+        json.dumps(dict(title=f"Imported {i}", description="")) + "\n"
+        for i in range(rows))
+    while not stop.is_set():
+        response = client.post(
+            "/import/tasks", data=body, content_type="application/x-ndjson")
+        if response.status_code < 400:
+            imported.append(rows)
+
+
+def run_phase(app, tasks, writers, seconds, import_rows):
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    imported = []
+
+    threads = [
+        threading.Thread(target=put_tasks, args=(app, tasks, stop, latencies, errors))
+        for _ in range(writers)
+    ]
+    if import_rows:
+        threads.append(threading.Thread(
+            target=import_tasks, args=(app, import_rows, stop, imported)))
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return dict(
+        writes_per_sec=len(latencies) / elapsed,
+        errors=len(errors),
+        p50_ms=percentile(latencies, 0.50) * 1000 if latencies else 0.0,
+        p99_ms=percentile(latencies, 0.99) * 1000 if latencies else 0.0,
+        imported_rows_per_sec=sum(imported) / elapsed,
+    )
+
+
+def run(database, tasks, writers, seconds, import_rows):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database
+    from app import create_app, db
+    from app.models.goal import Goal
+    from app.models.task import Task
+
+    app = create_app()
+    with app.app_context():
+        seed(db, Task, Goal, tasks, 0)
+        db.session.remove()
+
+    return dict(
+        database=database.split(":", 1)[0],
+        writers=writers,
+        puts_alone=run_phase(app, tasks, writers, seconds, 0),
+        puts_with_import=run_phase(app, tasks, writers, seconds, import_rows),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default=os.environ.get(
+        "BENCHMARK_DATABASE_URI", DEFAULT_DATABASE))
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--import-rows", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    report = run(args.database, args.tasks, args.writers, args.seconds, args.import_rows)
+    print(f"{'phase':18} {'writes/s':>10} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>7} {'imported/s':>11}")
+    for phase in ("puts_alone", "puts_with_import"):
+        result = report[phase]
+        print(f"{phase:18} {result['writes_per_sec']:10.0f} {result['p50_ms']:9.2f} "
+              f"{result['p99_ms']:9.2f} {result['errors']:7} "
+              f"{result['imported_rows_per_sec']:11.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Route-level benchmarks for every task and goal endpoint.
+
+    python -m benchmarks.routes --tasks 100000 --goals 1000 --output run.json
+    python -m benchmarks.routes --compare baseline.json run.json
+
+The target database (BENCHMARK_DATABASE_URI or --database, default a SQLite
+file in the temp directory) is dropped and reseeded on every run, so never
+point it at data you want to keep.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+DEFAULT_DATABASE = "sqlite:///" + os.path.join(
+    tempfile.gettempdir(), "task-list-benchmark.db")
+BENCHMARKED_BLUEPRINTS = ("task", "goal")
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb():
+    # the current resident set, where ru_maxrss is the process's lifetime
+    # peak and would charge one scenario's peak to every scenario after it.
+    # None where there's no /proc
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def count_rows(response):
+    body = response.get_json(silent=True)
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict):
+        for value in body.values():
+            if isinstance(value, list):
+                return len(value)
+    return 1
+
+
+class Scenario:
+    def __init__(self, name, endpoint, method, url, body=None, setup=None,
+                 iterations=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.body = body
+        self.setup = setup
+        self.iterations = iterations
+
+
+def seed(db, Task, Goal, tasks, goals, chunk=10000):
+    db.drop_all()
+    db.create_all()
+
+    for start in range(0, goals, chunk):
+        db.session.execute(Goal.__table__.insert(), [
+            dict(title=f"Goal {i}") for i in range(start, min(goals, start + chunk))
+        ])
+
+    now = datetime.datetime.utcnow()
+    for start in range(0, tasks, chunk):
+        db.session.execute(Task.__table__.insert(), [
+            dict(
+                title=f"Task {i % 997:03d} {i}",
+                description=f"Benchmark task number {i}",
+                completed_at=now if i % 3 == 0 else None,
+                goal_id=i % goals + 1 if goals else None,
+            )
+            for i in range(start, min(tasks, start + chunk))
+        ])
+        db.session.commit()
+
+    # the bulk inserts above skip the routes that maintain goal counters
+    Goal.query.update(Goal.counter_values(), synchronize_session=False)
+    db.session.commit()
+
+
+def build_scenarios(db, Task, Goal, rng, tasks, goals):
+    def task_id():
+        return rng.randint(1, tasks)
+
+    def goal_id():
+        return rng.randint(1, goals)
+
+    def new_task():
+        result = db.session.execute(Task.__table__.insert(), dict(
+            title="Disposable", description=""))
+        db.session.commit()
+        return result.inserted_primary_key[0]
+
+    def new_goal():
+        result = db.session.execute(Goal.__table__.insert(), dict(title="Disposable"))
+        db.session.commit()
+        return result.inserted_primary_key[0]
+
+    def goal_with_task_ids():
+        goal = goal_id()
+        return goal, [row[0] for row in db.session.query(Task.task_id).filter(
+            Task.goal_id == goal).order_by(Task.task_id)]
+
+    def deep_cursor(sort):
+        from app.pagination import encode_cursor
+        if sort:
+            title = db.session.query(Task.title).order_by(Task.title).offset(
+                tasks // 2).limit(1).scalar()
+            return encode_cursor([title, tasks // 2])
+        return encode_cursor([tasks // 2])
+
+    mid_cursor = deep_cursor(False)
+    mid_sorted_cursor = deep_cursor(True)
+
+    return [
+        Scenario("tasks_first_page", "task.task_index", "GET",
+                 lambda _: "/tasks?limit=100"),
+        Scenario("tasks_deep_page", "task.task_index", "GET",
+                 lambda _: f"/tasks?limit=100&cursor={mid_cursor}"),
+        Scenario("tasks_sorted_first_page", "task.task_index", "GET",
+                 lambda _: "/tasks?sort=asc&limit=100"),
+        Scenario("tasks_sorted_deep_page", "task.task_index", "GET",
+                 lambda _: f"/tasks?sort=asc&limit=100&cursor={mid_sorted_cursor}"),
+        Scenario("tasks_filtered", "task.task_index", "GET",
+                 lambda _: f"/tasks?goal_id={goal_id()}&is_complete=false&limit=100"),
+        Scenario("tasks_title_prefix", "task.task_index", "GET",
+                 lambda _: "/tasks?title_prefix=Task%2012&sort=asc&limit=100"),
+        Scenario("tasks_stream", "task.task_index", "GET",
+                 lambda _: "/tasks?stream=1", iterations=3),
+        Scenario("task_search", "task.search_task_index", "GET",
+                 lambda _: f"/tasks/search?q={task_id()}&limit=20"),
+        Scenario("task_get", "task.get_one_task", "GET",
+                 lambda _: f"/tasks/{task_id()}"),
+        Scenario("task_create", "task.create_task", "POST",
+                 lambda _: "/tasks",
+                 body=lambda _: dict(title="Benchmark", description="")),
+        Scenario("task_create_bulk", "task.create_tasks_bulk", "POST",
+                 lambda _: "/tasks/bulk",
+                 body=lambda _: [dict(title=f"Bulk {i}", description="")
+                                 for i in range(1000)],
+                 iterations=10),
+        Scenario("task_update", "task.update_task", "PUT",
+                 lambda _: f"/tasks/{task_id()}",
+                 body=lambda _: dict(title="Updated", description="")),
+        Scenario("task_delete", "task.delete_task", "DELETE",
+                 lambda created: f"/tasks/{created}", setup=new_task),
+        Scenario("task_mark_complete", "task.mark_complete", "PATCH",
+                 lambda _: f"/tasks/{task_id()}/mark_complete"),
+        Scenario("task_mark_incomplete", "task.mark_incomplete", "PATCH",
+                 lambda _: f"/tasks/{task_id()}/mark_incomplete"),
+        Scenario("tasks_mark_complete_many", "task.mark_many_complete", "PATCH",
+                 lambda _: "/tasks/mark_complete",
+                 body=lambda _: dict(task_ids=[task_id() for _ in range(500)]),
+                 iterations=10),
+        Scenario("tasks_mark_incomplete_many", "task.mark_many_incomplete", "PATCH",
+                 lambda _: "/tasks/mark_incomplete",
+                 body=lambda _: dict(filter=dict(goal_id=goal_id(), is_complete=True)),
+                 iterations=10),
+        Scenario("goals_first_page", "goal.goal_index", "GET",
+                 lambda _: "/goals?limit=100"),
+        Scenario("goals_with_tasks", "goal.goal_index", "GET",
+                 lambda _: "/goals?include=tasks&limit=100"),
+        Scenario("goal_get", "goal.get_one_goal", "GET",
+                 lambda _: f"/goals/{goal_id()}"),
+        Scenario("goal_create", "goal.create_goal", "POST",
+                 lambda _: "/goals", body=lambda _: dict(title="Benchmark")),
+        Scenario("goal_update", "goal.update_goal", "PUT",
+                 lambda _: f"/goals/{goal_id()}",
+                 body=lambda _: dict(title="Updated")),
+        Scenario("goal_delete", "goal.delete_goal", "DELETE",
+                 lambda created: f"/goals/{created}", setup=new_goal),
+        Scenario("goal_set_tasks", "goal.set_goal_tasks", "POST",
+                 lambda goal: f"/goals/{goal[0]}/tasks",
+                 body=lambda goal: dict(task_ids=goal[1]),
+                 setup=goal_with_task_ids),
+        Scenario("goals_with_progress", "goal.goal_index", "GET",
+                 lambda _: "/goals?with_progress=1&limit=100"),
+        Scenario("goal_progress", "goal.get_goal_progress", "GET",
+                 lambda _: f"/goals/{goal_id()}/progress"),
+        Scenario("goal_tasks", "goal.get_goal_tasks", "GET",
+                 lambda _: f"/goals/{goal_id()}/tasks"),
+    ]
+
+
+def check_coverage(app, scenarios):
+    covered = {scenario.endpoint for scenario in scenarios}
+    endpoints = {
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if rule.endpoint.split(".")[0] in BENCHMARKED_BLUEPRINTS
+    }
+    missing = sorted(endpoints - covered)
+    if missing:
+        raise SystemExit(f"no benchmark scenario for: {', '.join(missing)}")
+
+
+def run_scenario(client, db, scenario, iterations):
+    latencies = []
+    rows = 0
+    errors = 0
+    rss_before = rss_mb()
+    rss_peak = rss_before
+
+    for _ in range(scenario.iterations or iterations):
+        context = scenario.setup() if scenario.setup else None
+        url = scenario.url(context)
+        body = scenario.body(context) if scenario.body else None
+
+        start = time.perf_counter()
+        response = client.open(url, method=scenario.method, json=body)
+        data = response.get_data()
+        elapsed = time.perf_counter() - start
+
+        latencies.append(elapsed)
+        if response.status_code >= 400:
+            errors += 1
+        elif data:
+            rows += count_rows(response)
+        # sampled while the response body is still held
+        if rss_before is not None:
+            rss_peak = max(rss_peak, rss_mb())
+        db.session.remove()
+
+    total = sum(latencies)
+    return dict(
+        endpoint=scenario.endpoint,
+        iterations=len(latencies),
+        errors=errors,
+        p50_ms=percentile(latencies, 0.50) * 1000,
+        p95_ms=percentile(latencies, 0.95) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        rows_per_sec=rows / total if total else 0.0,
+        rss_delta_mb=rss_peak - rss_before if rss_before is not None else None,
+    )
+
+
+def run(database, tasks, goals, iterations, seed_value=0, only=None):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = database
+    from app import create_app, db
+    from app.models.goal import Goal
+    from app.models.task import Task
+
+    app = create_app()
+    rng = random.Random(seed_value)
+    results = {}
+
+    with app.app_context():
+        seed(db, Task, Goal, tasks, goals)
+        scenarios = build_scenarios(db, Task, Goal, rng, tasks, goals)
+        check_coverage(app, scenarios)
+        client = app.test_client()
+
+        for scenario in scenarios:
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = run_scenario(client, db, scenario, iterations)
+
+        backend = db.engine.url.get_backend_name()
+
+    return dict(
+        meta=dict(
+            database=backend,
+            tasks=tasks,
+            goals=goals,
+            iterations=iterations,
+            python=platform.python_version(),
+            started_at=datetime.datetime.utcnow().isoformat(),
+        ),
+        results=results,
+    )
+
+
+def compare(baseline, current, threshold):
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = result["p95_ms"] / before["p95_ms"] if before["p95_ms"] else 1.0
+        marker = ""
+        if ratio > threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:28} p95 {before['p95_ms']:9.2f} -> {result['p95_ms']:9.2f} ms "
+              f"({ratio:5.2f}x){marker}")
+    return regressions
+
+
+def print_results(report):
+    print(f"{'scenario':28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'rows/s':>11} {'+rss MB':>8}")
+    for name, result in report["results"].items():
+        rss = result.get("rss_delta_mb")
+        print(f"{name:28} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+              f"{result['p99_ms']:9.2f} {result['rows_per_sec']:11.0f} "
+              f"{'-' if rss is None else format(rss, '.1f'):>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", default=os.environ.get(
+        "BENCHMARK_DATABASE_URI", DEFAULT_DATABASE))
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--goals", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="diff two reports instead of running")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="p95 ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)
+        with open(args.compare[1]) as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, args.threshold)
+        return 1 if regressions else 0
+
+    report = run(args.database, args.tasks, args.goals, args.iterations,
+                 args.seed, args.only)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Per-row cost of serializing tasks through ORM instances vs column tuples.
+
+    python benchmarks/row_serialization.py --rows 100000
+
+Uses SQLALCHEMY_DATABASE_URI when it is set, otherwise an in-memory SQLite
+database.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+
+from flask import json
+from app import create_app, db
+from app.models.task import Task
+
+
+def orm_path():
+    tasks = Task.query.order_by(Task.task_id).all()
+    return json.dumps([task.to_dict() for task in tasks])
+
+
+def projection_path():
+    rows = db.session.query(*Task.row_columns()).order_by(Task.task_id).all()
+    return json.dumps([Task.row_to_dict(row) for row in rows])
+
+
+def measure(path, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        output = path()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if Task.query.count() < args.rows:
+            db.session.execute(Task.__table__.insert(), [
+                dict(title=f"Task {i}", description="benchmark row",
+                     goal_id=None)
+                for i in range(args.rows)
+            ])
+            db.session.commit()
+
+        orm_seconds, orm_output = measure(orm_path, args.repeat)
+        projection_seconds, projection_output = measure(
+            projection_path, args.repeat)
+
+        rows = Task.query.count()
+        print(f"rows:        {rows}")
+        print(f"orm:         {orm_seconds / rows * 1e6:.2f} us/row")
+        print(f"projection:  {projection_seconds / rows * 1e6:.2f} us/row")
+        print(f"speedup:     {orm_seconds / projection_seconds:.2f}x")
+        print(f"identical:   {orm_output == projection_output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,118 @@
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 
-url = "http://localhost:5000"
+url = os.environ.get("TASK_LIST_URL", "http://localhost:5000")
+cache_path = os.environ.get(
+    "TASK_LIST_CACHE", os.path.expanduser("~/.task_list_cache.db"))
+
+MAX_WORKERS = 8
+SYNC_PAGE_SIZE = 1000
+
+# one keep-alive connection pool for every request, big enough for the
+# bulk thread pool
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
+_cache = None
+
+def get_cache():
+    # a local mirror of the server's tasks, kept current from /changes, so
+    # reads cost one small request and still work offline
+    global _cache
+    if _cache is None:
+        _cache = sqlite3.connect(cache_path, check_same_thread=False)
+        _cache.executescript("""
+            CREATE TABLE IF NOT EXISTS task (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                is_complete INTEGER NOT NULL,
+                goal_id INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                server TEXT PRIMARY KEY,
+                last_seq INTEGER NOT NULL
+            );
+        """)
+    return _cache
+
+def row_to_task(row):
+    id, title, description, is_complete, goal_id = row
+    task = {
+        "id": id,
+        "title": title,
+        "description": description,
+        "is_complete": bool(is_complete)
+    }
+    if goal_id:
+        task["goal_id"] = goal_id
+    return task
+
+def save_task(task):
+    get_cache().execute(
+        "INSERT OR REPLACE INTO task VALUES (?, ?, ?, ?, ?)",
+        (task["id"], task["title"], task["description"],
+         task["is_complete"], task.get("goal_id")))
+
+def forget_task(id):
+    get_cache().execute("DELETE FROM task WHERE id = ?", (id,))
+
+def last_seq():
+    row = get_cache().execute(
+        "SELECT last_seq FROM sync_state WHERE server = ?", (url,)).fetchone()
+    return row[0] if row else None
+
+def sync():
+    # pulls only what changed since the last sync; returns False when the
+    # server can't be reached and the mirror is all there is
+    cache = get_cache()
+    since = last_seq()
+    params = {"since": since or 0, "limit": SYNC_PAGE_SIZE}
+
+    try:
+        with cache:
+            if since is None:
+                # first sync, or a different server: start from scratch
+                cache.execute("DELETE FROM task")
+
+            while True:
+                response = session.get(url+"/changes", params=params)
+                response.raise_for_status()
+                page = response.json()
+
+                for change in page["changes"]:
+                    if change["type"] != "task":
+                        continue
+                    if change["op"] == "delete":
+                        forget_task(change["id"])
+                    else:
+                        save_task(change["task"])
+
+                if not page["next_cursor"]:
+                    break
+                params = {"cursor": page["next_cursor"], "limit": SYNC_PAGE_SIZE}
+
+            cache.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                (url, page["last_seq"]))
+    except requests.RequestException:
+        return False
+
+    return True
 
 def parse_response(response):
     if response.status_code >= 400:
         return None
-    
-    return response.json()["task"]
+
+    task = response.json()["task"]
+    # written through so the next read doesn't wait for a sync
+    with get_cache():
+        save_task(task)
+    return task
 
 def create_task(title, description, completed_at=None):
     query_params = {
@@ -14,19 +120,28 @@ def create_task(title, description, completed_at=None):
         "description": description,
         "completed_at": completed_at
     }
-    response = requests.post(url+"/tasks",json=query_params)
+    response = session.post(url+"/tasks",json=query_params)
     return parse_response(response)
 
 def list_tasks():
-    response = requests.get(url+"/tasks")
-    return response.json()
+    sync()
+    rows = get_cache().execute(
+        "SELECT id, title, description, is_complete, goal_id FROM task ORDER BY id")
+    return [row_to_task(row) for row in rows]
+
+def has_tasks():
+    sync()
+    return get_cache().execute("SELECT 1 FROM task LIMIT 1").fetchone() is not None
 
 def get_task(id):
-    response = requests.get(url+f"/tasks/{id}")
-    if response.status_code != 200:
+    sync()
+    row = get_cache().execute(
+        "SELECT id, title, description, is_complete, goal_id FROM task WHERE id = ?",
+        (id,)).fetchone()
+    if not row:
         return None
-        
-    return parse_response(response)
+
+    return row_to_task(row)
 
 def update_task(id,title,description):
 
@@ -35,7 +150,7 @@ def update_task(id,title,description):
         "description": description
     }
 
-    response = requests.put(
+    response = session.put(
         url+f"/tasks/{id}",
         json=query_params
         )
@@ -43,17 +158,32 @@ def update_task(id,title,description):
     return parse_response(response)
 
 def delete_task(id):
-    response = requests.delete(url+f"/tasks/{id}")
+    response = session.delete(url+f"/tasks/{id}")
+    if response.status_code < 400:
+        with get_cache():
+            forget_task(id)
     return response.json()
 
+def delete_all_tasks():
+    # the API deletes one task per request, so the requests run
+    # concurrently over the shared connection pool
+    ids = [task["id"] for task in list_tasks()]
+
+    def delete(id):
+        return session.delete(url+f"/tasks/{id}").status_code < 400
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        deleted = [id for id, ok in zip(ids, executor.map(delete, ids)) if ok]
+
+    with get_cache():
+        get_cache().executemany(
+            "DELETE FROM task WHERE id = ?", [(id,) for id in deleted])
+    return len(deleted)
+
 def mark_complete(id):
-    response = requests.patch(url+f"/tasks/{id}/mark_complete")
+    response = session.patch(url+f"/tasks/{id}/mark_complete")
     return parse_response(response)
 
 def mark_incomplete(id):
-    response = requests.patch(url+f"/tasks/{id}/mark_incomplete")
+    response = session.patch(url+f"/tasks/{id}/mark_incomplete")
     return parse_response(response)
-
-
-
-    
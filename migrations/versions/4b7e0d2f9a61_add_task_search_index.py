@@ -0,0 +1,66 @@
+"""add task search index
+
+Revision ID: 4b7e0d2f9a61
+Revises: e2a91c7d4b08
+Create Date: 2026-10-18 10:41:27.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e0d2f9a61'
+down_revision = 'e2a91c7d4b08'
+branch_labels = None
+depends_on = None
+
+# spelled out rather than imported from the models, so this revision stays
+# what it was when the models change
+POSTGRES_SEARCH_INDEX = (
+    "CREATE INDEX CONCURRENTLY ix_task_search_vector ON task USING GIN ("
+    "(setweight(to_tsvector('english', task.title), 'A') || "
+    "setweight(to_tsvector('english', task.description), 'B')))"
+)
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE task_fts USING fts5("
+    "title, description, content='task', content_rowid='task_id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts (rowid, title, description) "
+    "VALUES (new.task_id, new.title, new.description); END",
+    "CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts (task_fts, rowid, title, description) "
+    "VALUES ('delete', old.task_id, old.title, old.description); END",
+    "CREATE TRIGGER task_fts_update AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts (task_fts, rowid, title, description) "
+    "VALUES ('delete', old.task_id, old.title, old.description); "
+    "INSERT INTO task_fts (rowid, title, description) "
+    "VALUES (new.task_id, new.title, new.description); END",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # an expression index: no column to add, so task is never
+        # rewritten, and CONCURRENTLY keeps it writable during the build
+        with op.get_context().autocommit_block():
+            op.execute(POSTGRES_SEARCH_INDEX)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # index the rows that predate the table
+        op.execute("INSERT INTO task_fts (task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_task_search_vector', table_name='task',
+                          postgresql_concurrently=True)
+    elif dialect == 'sqlite':
+        for trigger in ('task_fts_insert', 'task_fts_delete', 'task_fts_update'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS task_fts")
@@ -0,0 +1,32 @@
+"""add task indexes
+
+Revision ID: 7cfd3704839c
+Revises: 03201e1f72e1
+Create Date: 2026-10-18 09:35:50.263741
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7cfd3704839c'
+down_revision = '03201e1f72e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction; it builds
+    # without holding a write lock on task, so production keeps serving
+    with op.get_context().autocommit_block():
+        op.create_index('ix_task_completed_at', 'task', ['completed_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_task_goal_id_task_id', 'task', ['goal_id', 'task_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_task_title_task_id', 'task', ['title', 'task_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_title_task_id', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_goal_id_task_id', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_completed_at', table_name='task', postgresql_concurrently=True)
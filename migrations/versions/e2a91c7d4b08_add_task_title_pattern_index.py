@@ -0,0 +1,32 @@
+"""add task title pattern index
+
+Revision ID: e2a91c7d4b08
+Revises: c44c5975b964
+Create Date: 2026-10-18 10:12:05.417322
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a91c7d4b08'
+down_revision = 'c44c5975b964'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres only, see the note on Task; SQLite already has what it needs
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.create_index('ix_task_title_pattern', 'task', ['title', 'task_id'], unique=False,
+                        postgresql_ops={'title': 'varchar_pattern_ops'}, postgresql_concurrently=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_task_title_pattern', table_name='task', postgresql_concurrently=True)
@@ -5,6 +5,7 @@ from app.models.goal import Goal
 from app import db
 from datetime import datetime
 from flask.signals import request_finished
+from sqlalchemy import event
 
 
 @pytest.fixture
@@ -30,6 +31,20 @@ def client(app):
     return app.test_client()
 
 
+# This fixture records every SQL statement sent to the
+# database while a test runs
+@pytest.fixture
+def sql_statements(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
 # This fixture gets called in every test that
 # references "one_task"
 # This fixture creates a task and saves it in the database
@@ -58,6 +73,26 @@ def three_tasks(app):
     db.session.commit()
 
 
+# This fixture gets called in every test that
+# references "five_tasks"
+# This fixture creates five tasks whose titles
+# sort in a different order than their ids
+@pytest.fixture
+def five_tasks(app):
+    db.session.add_all([
+        Task(title=title, description="", completed_at=None)
+        for title in ["E", "B", "D", "A", "C"]
+    ])
+    db.session.commit()
+
+
+# the task ids of a list response, paginated or not
+def ids(response):
+    body = response.get_json()
+    tasks = body["tasks"] if isinstance(body, dict) else body
+    return [task["id"] for task in tasks]
+
+
 # This fixture gets called in every test that
 # references "completed_task"
 # This fixture creates a task with a
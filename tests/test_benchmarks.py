@@ -0,0 +1,40 @@
+import json
+from benchmarks import routes
+
+
+def test_route_benchmarks_cover_every_endpoint(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setenv("SQLALCHEMY_DATABASE_URI", "")
+    output = tmp_path / "run.json"
+
+    # Act
+    exit_code = routes.main([
+        "--database", f"sqlite:///{tmp_path / 'bench.db'}",
+        "--tasks", "40", "--goals", "4", "--iterations", "2",
+        "--output", str(output),
+    ])
+
+    # Assert
+    assert exit_code == 0
+    report = json.loads(output.read_text())
+    assert report["meta"]["tasks"] == 40
+    for result in report["results"].values():
+        assert result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["rss_delta_mb"] >= 0
+
+
+def test_route_benchmark_compare_flags_regressions(tmp_path):
+    # Arrange
+    baseline = dict(results=dict(task_get=dict(p95_ms=2.0)))
+    current = dict(results=dict(task_get=dict(p95_ms=3.0)))
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+    (tmp_path / "current.json").write_text(json.dumps(current))
+
+    # Act
+    exit_code = routes.main([
+        "--compare", str(tmp_path / "baseline.json"), str(tmp_path / "current.json"),
+    ])
+
+    # Assert
+    assert exit_code == 1
@@ -0,0 +1,88 @@
+import json
+from app.models.task import Task
+
+
+def test_create_tasks_bulk_from_array(client, app):
+    # Arrange
+    app.config["BULK_INSERT_BATCH_SIZE"] = 2
+
+    # Act
+    response = client.post("/tasks/bulk", json=[
+        {"title": f"Task {i}", "description": f"Description {i}"}
+        for i in range(5)
+    ])
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 201
+    assert response_body == {"task_ids": [1, 2, 3, 4, 5]}
+    assert [task.title for task in Task.query.order_by(Task.task_id)] == [
+        "Task 0", "Task 1", "Task 2", "Task 3", "Task 4"]
+    assert Task.query.get(3).to_dict() == {
+        "id": 3,
+        "title": "Task 2",
+        "description": "Description 2",
+        "is_complete": False,
+    }
+
+
+def test_create_tasks_bulk_from_ndjson(client, three_tasks):
+    # Arrange
+    body = "\n".join(json.dumps({"title": title, "description": ""})
+                     for title in ["A", "B"]) + "\n\n"
+
+    # Act
+    response = client.post(
+        "/tasks/bulk", data=body, content_type="application/x-ndjson")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 201
+    assert response_body == {"task_ids": [4, 5]}
+    assert Task.query.get(5).title == "B"
+
+
+def test_create_tasks_bulk_reports_every_invalid_item(client):
+    # Act
+    response = client.post("/tasks/bulk", json=[
+        {"title": "Valid", "description": ""},
+        {"title": "No description"},
+        "not an object",
+        {"title": None, "description": ""},
+    ])
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 400
+    assert response_body == {
+        "details": "Invalid data",
+        "errors": [
+            {"index": 1, "details": "Invalid data"},
+            {"index": 2, "details": "Invalid data"},
+            {"index": 3, "details": "Invalid data"},
+        ],
+    }
+    assert Task.query.count() == 0
+
+
+def test_create_tasks_bulk_ndjson_invalid_line(client):
+    # Act
+    response = client.post(
+        "/tasks/bulk",
+        data='{"title": "A", "description": ""}\n{not json}\n',
+        content_type="application/x-ndjson")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 400
+    assert response_body["errors"] == [{"index": 1, "details": "Invalid data"}]
+
+
+def test_create_tasks_bulk_requires_array(client):
+    # Act
+    response = client.post("/tasks/bulk", json={"title": "A", "description": ""})
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 400
+    assert response_body == {"details": "Invalid data"}
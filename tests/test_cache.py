@@ -0,0 +1,190 @@
+import os
+import pytest
+from app import create_app, db
+from app.cache import FileCache, LRUCache
+from app.models.table_version import TableVersion
+from app.models.task import Task
+
+
+# the cache is off by default; these tests exercise the per-process one
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_expires_entries():
+    # Arrange
+    clock = FakeClock()
+    cache = LRUCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("task:1", {"id": 1})
+
+    # Act
+    fresh = cache.get("task:1")
+    clock.now = 5
+    expired = cache.get("task:1")
+
+    # Assert
+    assert fresh == {"id": 1}
+    assert expired is None
+    assert cache.stats.to_dict() == dict(hits=1, misses=1, evictions=1)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    # Arrange
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("task:1", 1)
+    cache.set("task:2", 2)
+    cache.get("task:1")
+
+    # Act
+    cache.set("task:3", 3)
+
+    # Assert
+    assert cache.get("task:2") is None
+    assert cache.get("task:1") == 1
+    assert cache.get("task:3") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_file_cache_is_shared_between_workers(tmp_path):
+    # Arrange
+    worker_a = FileCache(str(tmp_path), ttl=60)
+    worker_b = FileCache(str(tmp_path), ttl=60)
+
+    # Act
+    worker_a.set("task:1", {"id": 1})
+    seen_by_b = worker_b.get("task:1")
+    worker_b.delete("task:1")
+
+    # Assert
+    assert seen_by_b == {"id": 1}
+    assert worker_a.get("task:1") is None
+    assert worker_b.stats.hits == 1
+    assert worker_a.stats.misses == 1
+
+
+def test_file_cache_sweeps_least_recently_read_beyond_maxsize(tmp_path):
+    # Arrange
+    cache = FileCache(str(tmp_path), ttl=60, maxsize=10)
+    for task_id in range(10):
+        cache.set(f"task:{task_id}", task_id)
+    for task_id in range(10):
+        os.utime(cache._path(f"task:{task_id}"), (task_id, task_id))
+    cache.get("task:0")
+
+    # Act
+    cache.set("task:10", 10)
+
+    # Assert
+    assert len(list(tmp_path.glob("*.json"))) == 10
+    assert cache.get("task:1") is None
+    assert cache.get("task:0") == 0
+    assert cache.get("task:10") == 10
+    assert cache.stats.evictions == 1
+
+
+def test_get_task_served_from_cache(client, one_task, sql_statements):
+    # Arrange
+    client.get("/tasks/1")
+    sql_statements.clear()
+
+    # Act
+    response = client.get("/tasks/1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["task"]["title"] == "Go on my daily walk 🏞"
+    # the table version read for the ETag, and no task query
+    assert len(sql_statements) == 1
+    assert "FROM table_version" in sql_statements[0]
+    assert client.get("/stats/cache").get_json() == dict(
+        hits=1, misses=1, evictions=0)
+
+
+def test_lru_cache_misses_entries_from_another_version():
+    # Arrange
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set("task:1", {"id": 1}, version=3)
+
+    # Act
+    stale = cache.get("task:1", version=4)
+
+    # Assert
+    assert stale is None
+    assert cache.get("task:1", version=3) is None
+    assert cache.stats.to_dict() == dict(hits=0, misses=2, evictions=1)
+
+
+def test_cached_task_not_served_after_write_by_another_worker(client, one_task):
+    # Arrange
+    client.get("/tasks/1")
+
+    # Act
+    # what another worker's PUT does: this worker's cache is never told
+    Task.query.filter_by(task_id=1).update({Task.title: "Renamed"})
+    TableVersion.bump("task")
+    db.session.commit()
+    response = client.get("/tasks/1")
+
+    # Assert
+    assert response.get_json()["task"]["title"] == "Renamed"
+    assert response.headers["ETag"] == '"task-1"'
+
+
+@pytest.mark.parametrize("method, url, body", [
+    ("put", "/tasks/1", {"title": "Updated", "description": ""}),
+    ("patch", "/tasks/1/mark_complete", None),
+    ("post", "/goals/1/tasks", {"task_ids": []}),
+    ("delete", "/goals/1", None),
+])
+def test_task_mutations_invalidate_cached_task(client, one_task_belongs_to_one_goal, method, url, body):
+    # Arrange
+    before = client.get("/tasks/1").get_json()
+
+    # Act
+    getattr(client, method)(url, json=body)
+    after = client.get("/tasks/1").get_json()
+
+    # Assert
+    assert after != before
+
+
+def test_delete_task_invalidates_cached_task(client, one_task):
+    # Arrange
+    client.get("/tasks/1")
+
+    # Act
+    client.delete("/tasks/1")
+    response = client.get("/tasks/1")
+
+    # Assert
+    assert response.status_code == 404
+
+
+def test_update_goal_invalidates_cached_goal(client, one_goal):
+    # Arrange
+    client.get("/goals/1")
+
+    # Act
+    client.put("/goals/1", json={"title": "Updated Goal Title"})
+    response = client.get("/goals/1")
+
+    # Assert
+    assert response.get_json()["goal"]["title"] == "Updated Goal Title"
+
+
+def test_unknown_cache_backend_is_rejected(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("CACHE_BACKEND", "carrier-pigeon")
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        create_app({"TESTING": True})
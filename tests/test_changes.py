@@ -0,0 +1,105 @@
+from app import db
+from app.models.task import Task
+
+
+def read_all(client, since):
+    changes = []
+    response = client.get(f"/changes?since={since}&limit=2").get_json()
+    changes.extend(response["changes"])
+    while response["next_cursor"]:
+        response = client.get(
+            f"/changes?cursor={response['next_cursor']}&limit=2").get_json()
+        changes.extend(response["changes"])
+    return changes, response["last_seq"]
+
+
+def test_changes_empty(client):
+    # Act
+    response = client.get("/changes")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == dict(changes=[], next_cursor=None, last_seq=0)
+
+
+def test_changes_since_returns_only_later_writes(client):
+    # Arrange
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/tasks", json={"title": "B", "description": ""})
+    first = client.get("/changes").get_json()
+
+    # Act
+    client.patch("/tasks/2/mark_complete")
+    response = client.get(f"/changes?since={first['last_seq']}").get_json()
+
+    # Assert
+    assert first["last_seq"] == 2
+    assert [change["task"]["title"] for change in first["changes"]] == ["A", "B"]
+    assert response == dict(
+        changes=[dict(seq=3, type="task", op="upsert", task=dict(
+            id=2, title="B", description="", is_complete=True))],
+        next_cursor=None,
+        last_seq=3,
+    )
+
+
+def test_changes_report_deletes_as_tombstones(client):
+    # Arrange
+    client.post("/goals", json={"title": "Goal"})
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/tasks", json={"title": "B", "description": ""})
+    client.post("/goals/1/tasks", json={"task_ids": [1, 2]})
+    since = client.get("/changes").get_json()["last_seq"]
+
+    # Act
+    client.delete("/goals/1")
+    client.delete("/tasks/1")
+    changes, last_seq = read_all(client, since)
+
+    # Assert
+    # task 1 was detached and then deleted, so only its tombstone is left
+    assert [(change["seq"], change["type"], change["op"]) for change in changes] == [
+        (since + 1, "task", "upsert"),
+        (since + 1, "goal", "delete"),
+        (since + 2, "task", "delete"),
+    ]
+    assert changes[0]["task"] == dict(id=2, title="B", description="", is_complete=False)
+    assert changes[1]["id"] == 1
+    assert changes[2]["id"] == 1
+    assert last_seq == since + 2
+
+
+def test_changes_page_within_one_transaction(client):
+    # Arrange
+    client.post("/tasks/bulk", json=[
+        {"title": f"Task {i}", "description": ""} for i in range(5)])
+
+    # Act
+    changes, last_seq = read_all(client, 0)
+
+    # Assert
+    assert [change["task"]["id"] for change in changes] == [1, 2, 3, 4, 5]
+    assert {change["seq"] for change in changes} == {1}
+    assert last_seq == 1
+
+
+def test_changes_one_seq_per_transaction(client, one_goal, three_tasks):
+    # Act
+    client.post("/goals/1/tasks", json={"task_ids": [1, 2, 3]})
+    client.patch("/tasks/mark_complete", json={"task_ids": [1, 3]})
+
+    # Assert
+    seqs = dict(db.session.query(Task.task_id, Task.change_seq))
+    assert seqs[1] == seqs[3] == seqs[2] + 1
+
+
+def test_changes_invalid_position(client):
+    # Act
+    since = client.get("/changes?since=-1")
+    cursor = client.get("/changes?cursor=WzFd")
+
+    # Assert
+    assert since.status_code == 400
+    assert since.get_json() == {"details": "Invalid since"}
+    assert cursor.status_code == 400
+    assert cursor.get_json() == {"details": "Invalid cursor"}
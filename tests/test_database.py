@@ -0,0 +1,96 @@
+import threading
+import time
+from flask import g
+from sqlalchemy import create_engine
+from app.database import (
+    TimedQueuePool, engine_options, pool_wait_stats,
+    statement_timeout_override, warm_pool)
+
+
+def test_engine_options_from_environment(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+
+    # Act
+    options = engine_options("postgresql://localhost/task_list_api")
+
+    # Assert
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 12
+    assert options["max_overflow"] == 3
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is False
+
+
+def test_engine_options_leave_sqlite_alone():
+    # Act / Assert
+    assert engine_options("sqlite://") == {}
+
+
+def test_timed_pool_records_checkout_wait(tmp_path):
+    # Arrange
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=1, max_overflow=0)
+    held = engine.connect()
+    before = pool_wait_stats.to_dict()
+
+    def release():
+        time.sleep(0.2)
+        held.close()
+
+    # Act
+    threading.Thread(target=release).start()
+    engine.connect().close()
+
+    # Assert
+    after = pool_wait_stats.to_dict()
+    assert after["checkouts"] == before["checkouts"] + 1
+    assert after["wait_seconds_total"] - before["wait_seconds_total"] >= 0.15
+    assert after["wait_seconds_max"] >= 0.15
+
+
+def test_warm_pool_opens_minimum_connections(tmp_path):
+    # Arrange
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool, pool_size=3, max_overflow=0)
+
+    # Act
+    warm_pool(engine)
+
+    # Assert
+    assert engine.pool.checkedin() == 3
+
+
+def test_statement_timeout_set_once_per_connection():
+    # Act
+    options = engine_options("postgresql://localhost/task_list_api", 30000)
+
+    # Assert
+    assert options["connect_args"] == dict(options="-c statement_timeout=30000")
+
+
+def test_statement_timeout_can_be_overridden_per_request(app):
+    # Act
+    with app.test_request_context():
+        default = statement_timeout_override()
+        g.statement_timeout_ms = 120000
+        overridden = statement_timeout_override()
+
+    # Assert
+    assert default is None
+    assert overridden == 120000
+
+
+def test_pool_stats(client):
+    # Act
+    response = client.get("/stats/pool")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert set(response_body) >= {"checkouts", "wait_seconds_total", "wait_seconds_max"}
@@ -0,0 +1,70 @@
+import pytest
+
+
+@pytest.mark.parametrize("url", ["/tasks", "/tasks/1", "/goals/1/tasks"])
+def test_get_returns_not_modified_for_current_etag(client, one_task_belongs_to_one_goal, sql_statements, url):
+    # Arrange
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    sql_statements.clear()
+
+    # Act
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    # Assert
+    assert first.status_code == 200
+    assert not etag.startswith("W/")
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == etag
+    # only the table versions behind the tag are read
+    assert len(sql_statements) == 1
+    assert "FROM table_version" in sql_statements[0]
+
+
+@pytest.mark.parametrize("method, url, body, watched", [
+    ("post", "/tasks", {"title": "New", "description": ""}, "/tasks"),
+    ("post", "/tasks/bulk", [{"title": "New", "description": ""}], "/tasks"),
+    ("put", "/tasks/1", {"title": "Updated", "description": ""}, "/tasks/1"),
+    ("delete", "/tasks/1", None, "/tasks"),
+    ("patch", "/tasks/1/mark_complete", None, "/tasks/1"),
+    ("patch", "/tasks/1/mark_incomplete", None, "/tasks/1"),
+    ("post", "/goals/1/tasks", {"task_ids": []}, "/goals/1/tasks"),
+    ("put", "/goals/1", {"title": "Updated"}, "/goals/1/tasks"),
+    ("delete", "/goals/1", None, "/tasks/1"),
+])
+def test_mutations_change_etags(client, one_task_belongs_to_one_goal, method, url, body, watched):
+    # Arrange
+    etag = client.get(watched).headers["ETag"]
+
+    # Act
+    response = getattr(client, method)(url, json=body)
+
+    # Assert
+    assert response.status_code in (200, 201)
+    response = client.get(watched, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_task_mutation_changes_task_etag(client, one_task):
+    # Arrange
+    etag = client.get("/tasks/1").headers["ETag"]
+
+    # Act
+    client.put("/tasks/1", json={"title": "Updated", "description": ""})
+    response = client.get("/tasks/1", headers={"If-None-Match": etag})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["task"]["title"] == "Updated"
+    assert response.headers["ETag"] != etag
+
+
+def test_not_found_has_no_etag(client):
+    # Act
+    response = client.get("/tasks/1")
+
+    # Assert
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -0,0 +1,169 @@
+import json
+import time
+from app import db
+from app.events import (
+    CLOSED, EventHub, MAX_NOTIFY_BYTES, SocketBroker, encode, record_event)
+
+
+def open_stream(client, **headers):
+    response = client.get("/events", headers=headers, buffered=False)
+    return response, response.iter_encoded()
+
+
+def read_events(chunks):
+    # one chunk per transaction; keepalive comments are skipped
+    for chunk in chunks:
+        chunk = chunk.decode()
+        if chunk.startswith(":"):
+            continue
+        events = []
+        for block in chunk.strip().split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((fields["event"], json.loads(fields["data"]), fields.get("id")))
+        return events
+
+
+def test_events_stream_pushes_writes(app, client):
+    # Arrange
+    app.config["EVENTS_KEEPALIVE"] = 0.01
+    response, chunks = open_stream(client)
+
+    # Act
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.patch("/tasks/1/mark_complete")
+    client.delete("/tasks/1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    assert read_events(chunks) == [("task.create", dict(
+        id=1, title="A", description="", is_complete=False), "1")]
+    assert read_events(chunks) == [("task.complete", dict(
+        id=1, title="A", description="", is_complete=True), "2")]
+    assert read_events(chunks) == [("task.delete", dict(id=1), "3")]
+    response.close()
+
+
+def test_events_resume_from_last_event_id(app, client):
+    # Arrange
+    app.config["EVENTS_KEEPALIVE"] = 0.01
+    client.post("/goals", json={"title": "Goal"})
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/goals/1/tasks", json={"task_ids": [1]})
+
+    # Act
+    response, chunks = open_stream(client, **{"Last-Event-ID": "1"})
+
+    # Assert
+    assert read_events(chunks)[0][0] == "task.create"
+    assert read_events(chunks) == [("goal.tasks_set", dict(
+        id=1, task_ids=[1], detached_task_ids=[]), "3")]
+    response.close()
+
+
+def test_events_reset_when_gap_is_older_than_buffer(app, client):
+    # Arrange
+    app.config["EVENTS_KEEPALIVE"] = 0.01
+    app.extensions["events"].hub.recent.clear()
+    client.post("/tasks", json={"title": "A", "description": ""})
+    app.extensions["events"].hub.recent.clear()
+    client.post("/tasks", json={"title": "B", "description": ""})
+
+    # Act
+    response, chunks = open_stream(client, **{"Last-Event-ID": "0"})
+
+    # Assert
+    assert read_events(chunks) == [("reset", dict(since=0, last_seq=2), "2")]
+    response.close()
+
+
+def test_events_invalid_last_event_id(client):
+    # Act
+    response = client.get("/events", headers={"Last-Event-ID": "abc"})
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == dict(details="Invalid Last-Event-ID")
+
+
+def test_events_not_published_on_rollback(app):
+    # Arrange
+    hub = app.extensions["events"].hub
+
+    # Act
+    record_event("task.update", dict(id=1))
+    db.session.rollback()
+    db.session.commit()
+
+    # Assert
+    assert list(hub.recent) == []
+
+
+def test_events_slow_subscriber_is_cut_off():
+    # Arrange
+    hub = EventHub(buffer_size=10, queue_size=2)
+    subscription, _, _ = hub.subscribe()
+
+    # Act
+    for seq in range(1, 4):
+        hub.dispatch(dict(seq=seq, events=[]))
+
+    # Assert
+    assert subscription.overflowed
+    assert subscription not in hub.subscribers
+    assert [subscription.get(0)["seq"], subscription.get(0)["seq"]] == [1, 2]
+    assert subscription.get(0) is CLOSED
+    assert len(hub.recent) == 3
+
+
+def test_events_socket_broker_fans_out_across_workers(tmp_path):
+    # Arrange
+    first = SocketBroker(EventHub(), str(tmp_path))
+    second = SocketBroker(EventHub(), str(tmp_path))
+    subscription, _, _ = second.subscribe()
+    message = dict(seq=1, events=[dict(event="task.delete", data=dict(id=1))])
+
+    # Act
+    first.publish(message)
+
+    # Assert
+    try:
+        assert subscription.get(2) == message
+        deadline = time.time() + 2
+        while not first.hub.recent and time.time() < deadline:
+            time.sleep(0.01)
+        assert list(first.hub.recent) == [message]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_events_oversized_payload_keeps_ids():
+    # Arrange
+    message = dict(seq=7, events=[dict(
+        event="task.update", data=dict(id=3, description="x" * MAX_NOTIFY_BYTES))])
+
+    # Act
+    payload = json.loads(encode(message, MAX_NOTIFY_BYTES))
+
+    # Assert
+    assert payload == dict(seq=7, events=[dict(
+        event="task.update", data=dict(id=3, truncated=True))])
+
+
+def test_writes_that_change_nothing_leave_no_gap(app, client):
+    # Arrange
+    app.config["EVENTS_KEEPALIVE"] = 0.01
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.patch("/tasks/mark_complete", json={"task_ids": [99]})
+    client.post("/import/tasks", data=json.dumps({"title": "B"}) + "\n",
+                content_type="application/x-ndjson")
+    client.patch("/tasks/1/mark_complete")
+
+    # Act
+    response, chunks = open_stream(client, **{"Last-Event-ID": "1"})
+
+    # Assert
+    assert read_events(chunks) == [("task.complete", dict(
+        id=1, title="A", description="", is_complete=True), "2")]
+    response.close()
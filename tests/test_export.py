@@ -0,0 +1,132 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+from app import db
+from app.models.task import Task
+
+
+def export(client, path, **headers):
+    response = client.get(path, headers=headers)
+    return response, response.get_data(as_text=True)
+
+
+def test_export_tasks_defaults_to_ndjson(client, completed_task):
+    # Act
+    response, body = export(client, "/export/tasks")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["X-Last-Seq"] == "0"
+    rows = [json.loads(line) for line in body.splitlines()]
+    completed_at = rows[0].pop("completed_at")
+    assert rows == [dict(
+        id=1,
+        title="Go on my daily walk 🏞",
+        description="Notice something new every day",
+        goal_id=None,
+        change_seq=0,
+    )]
+    assert datetime.fromisoformat(completed_at)
+
+
+def test_export_tasks_as_csv(client):
+    # Arrange
+    db.session.add_all([
+        Task(title="A, with a comma", description="line\nbreak",
+             completed_at=datetime(2024, 1, 2, 3, 4, 5)),
+        Task(title="B", description="", completed_at=None),
+    ])
+    db.session.commit()
+
+    # Act
+    response, body = export(client, "/export/tasks", Accept="text/csv")
+
+    # Assert
+    assert response.mimetype == "text/csv"
+    assert list(csv.reader(io.StringIO(body))) == [
+        ["id", "title", "description", "completed_at", "goal_id", "change_seq"],
+        ["1", "A, with a comma", "line\nbreak", "2024-01-02T03:04:05", "", "0"],
+        ["2", "B", "", "", "", "0"],
+    ]
+
+
+def test_export_tasks_gzip(client, three_tasks):
+    # Act
+    response = client.get("/export/tasks", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+
+
+def test_export_tasks_updated_since(client):
+    # Arrange
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/tasks", json={"title": "B", "description": ""})
+    first, _ = export(client, "/export/tasks")
+    client.patch("/tasks/1/mark_complete")
+
+    # Act
+    response, body = export(
+        client, f"/export/tasks?updated_since={first.headers['X-Last-Seq']}")
+
+    # Assert
+    assert first.headers["X-Last-Seq"] == "2"
+    assert response.headers["X-Last-Seq"] == "3"
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [(row["id"], row["change_seq"]) for row in rows] == [(1, 3)]
+
+
+def test_export_goals(client, one_goal):
+    # Arrange
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/goals/1/tasks", json={"task_ids": [1]})
+    client.patch("/tasks/1/mark_complete")
+
+    # Act
+    response, body = export(client, "/export/goals", Accept="text/csv")
+
+    # Assert
+    rows = list(csv.DictReader(io.StringIO(body)))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "Build a habit of going outside daily"
+    assert (rows[0]["task_count"], rows[0]["completed_count"]) == ("1", "1")
+    assert rows[0]["last_completed_at"]
+
+
+def test_export_goals_updated_since_includes_recounts(client, one_goal):
+    # Arrange
+    client.post("/tasks", json={"title": "A", "description": ""})
+    client.post("/goals/1/tasks", json={"task_ids": [1]})
+    first, _ = export(client, "/export/goals")
+    client.patch("/tasks/1/mark_complete")
+
+    # Act
+    response, body = export(
+        client, f"/export/goals?updated_since={first.headers['X-Last-Seq']}")
+
+    # Assert
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [(row["id"], row["completed_count"]) for row in rows] == [(1, 1)]
+    assert rows[0]["change_seq"] == int(response.headers["X-Last-Seq"])
+
+
+def test_export_unsupported_accept(client):
+    # Act
+    response = client.get("/export/tasks", headers={"Accept": "application/xml"})
+
+    # Assert
+    assert response.status_code == 406
+
+
+def test_export_invalid_updated_since(client):
+    # Act
+    response = client.get("/export/tasks?updated_since=yesterday")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == dict(details="Invalid updated_since")
@@ -0,0 +1,97 @@
+import pytest
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+
+
+def seed_goals(count):
+    db.session.execute(Goal.__table__.insert(), [
+        dict(title=f"Goal {i}") for i in range(count)
+    ])
+    db.session.execute(Task.__table__.insert(), [
+        dict(title=f"Task {i}", description="", goal_id=i // 2 + 1)
+        for i in range(count * 2)
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize("count", [1, 100, 10000])
+def test_get_goals_with_tasks_fixed_statement_count(client, app, sql_statements, count):
+    # Arrange
+    app.config["MAX_PAGE_SIZE"] = count
+    seed_goals(count)
+    sql_statements.clear()
+
+    # Act
+    response = client.get("/goals?include=tasks")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert len(sql_statements) == 1
+    assert len(response_body) == count
+    assert response_body[-1] == {
+        "id": count,
+        "title": f"Goal {count - 1}",
+        "tasks": [
+            {
+                "id": count * 2 - 1,
+                "goal_id": count,
+                "title": f"Task {count * 2 - 2}",
+                "description": "",
+                "is_complete": False,
+            },
+            {
+                "id": count * 2,
+                "goal_id": count,
+                "title": f"Task {count * 2 - 1}",
+                "description": "",
+                "is_complete": False,
+            },
+        ],
+    }
+
+
+def test_get_goals_with_tasks_paginated(client, app, sql_statements):
+    # Arrange
+    seed_goals(3)
+    sql_statements.clear()
+
+    # Act
+    first = client.get("/goals?include=tasks&limit=2").get_json()
+    second = client.get(
+        f"/goals?include=tasks&limit=2&cursor={first['next_cursor']}").get_json()
+
+    # Assert
+    assert len(sql_statements) == 2
+    assert [goal["id"] for goal in first["goals"]] == [1, 2]
+    assert [len(goal["tasks"]) for goal in first["goals"]] == [2, 2]
+    assert [goal["id"] for goal in second["goals"]] == [3]
+    assert [task["id"] for task in second["goals"][0]["tasks"]] == [5, 6]
+
+
+def test_get_goals_with_tasks_goal_without_tasks(client, one_goal):
+    # Act
+    response = client.get("/goals?include=tasks")
+
+    # Assert
+    assert response.get_json() == [{
+        "id": 1,
+        "title": "Build a habit of going outside daily",
+        "tasks": [],
+    }]
+
+
+def test_get_goal_tasks_single_statement(client, app, sql_statements):
+    # Arrange
+    seed_goals(2)
+    sql_statements.clear()
+
+    # Act
+    response = client.get("/goals/2/tasks")
+
+    # Assert
+    assert response.status_code == 200
+    # the table versions for the ETag, then the goal with its tasks
+    assert len(sql_statements) == 2
+    assert [task["id"] for task in response.get_json()["tasks"]] == [3, 4]
@@ -0,0 +1,134 @@
+from app import db
+from app.models.goal import Goal
+
+
+def progress(client, goal_id):
+    return client.get(f"/goals/{goal_id}/progress").get_json()
+
+
+def test_progress_follows_task_completion(client, one_goal, three_tasks):
+    # Arrange
+    client.post("/goals/1/tasks", json={"task_ids": [1, 2, 3]})
+
+    # Act
+    client.patch("/tasks/1/mark_complete")
+    client.patch("/tasks/2/mark_complete")
+    after_complete = progress(client, 1)
+    client.patch("/tasks/2/mark_incomplete")
+    after_incomplete = progress(client, 1)
+    client.delete("/tasks/3")
+    after_delete = progress(client, 1)
+
+    # Assert
+    assert after_complete["id"] == 1
+    assert after_complete["task_count"] == 3
+    assert after_complete["completed_count"] == 2
+    assert after_complete["last_completed_at"] is not None
+    assert after_incomplete["completed_count"] == 1
+    assert after_incomplete["last_completed_at"] <= after_complete["last_completed_at"]
+    assert after_delete["task_count"] == 2
+    assert after_delete["completed_count"] == 1
+
+
+def test_progress_moves_with_reassigned_tasks(client, three_tasks):
+    # Arrange
+    db.session.add_all([Goal(title="First"), Goal(title="Second")])
+    db.session.commit()
+    client.post("/goals/1/tasks", json={"task_ids": [1, 2]})
+    client.patch("/tasks/1/mark_complete")
+
+    # Act
+    client.post("/goals/2/tasks", json={"task_ids": [1, 3]})
+
+    # Assert
+    assert progress(client, 1) == dict(
+        id=1, task_count=1, completed_count=0, last_completed_at=None)
+    assert progress(client, 2)["task_count"] == 2
+    assert progress(client, 2)["completed_count"] == 1
+
+
+def test_progress_deltas_match_a_full_recount(app, client, one_goal, three_tasks):
+    # Arrange
+    client.post("/goals/1/tasks", json={"task_ids": [1, 2, 3]})
+
+    # Act
+    client.patch("/tasks/1/mark_complete")
+    client.patch("/tasks/1/mark_complete")
+    client.patch("/tasks/3/mark_incomplete")
+    client.patch("/tasks/mark_complete", json={"task_ids": [1, 2]})
+    client.patch("/tasks/mark_incomplete", json={"task_ids": [2, 3]})
+    client.post("/goals/1/tasks", json={"task_ids": [1, 3]})
+    result = app.test_cli_runner().invoke(args=["counters", "reconcile"])
+
+    # Assert
+    assert progress(client, 1)["task_count"] == 2
+    assert progress(client, 1)["completed_count"] == 1
+    assert "reconciled 0 goals" in result.output
+
+
+def test_progress_empty_goal(client, one_goal):
+    # Act
+    response = client.get("/goals/1/progress")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == dict(
+        id=1, task_count=0, completed_count=0, last_completed_at=None)
+
+
+def test_progress_unknown_goal(client, one_goal):
+    # Act
+    missing = client.get("/goals/2/progress")
+    invalid = client.get("/goals/abc/progress")
+
+    # Assert
+    assert missing.status_code == 404
+    assert missing.get_json() == {"details": "Unknown Goal id: 2"}
+    assert invalid.status_code == 404
+
+
+def test_goal_index_with_progress(client, one_goal, one_task, sql_statements):
+    # Arrange
+    client.post("/goals/1/tasks", json={"task_ids": [1]})
+    client.patch("/tasks/1/mark_complete")
+    sql_statements.clear()
+
+    # Act
+    response = client.get("/goals?with_progress=1")
+    with_tasks = client.get("/goals?with_progress=1&include=tasks").get_json()
+
+    # Assert
+    goals = response.get_json()
+    assert len(sql_statements) == 2
+    assert goals[0]["title"] == "Build a habit of going outside daily"
+    assert goals[0]["task_count"] == 1
+    assert goals[0]["completed_count"] == 1
+    assert with_tasks[0]["completed_count"] == 1
+    assert with_tasks[0]["tasks"][0]["is_complete"] is True
+
+
+def test_goal_index_without_progress_is_unchanged(client, one_goal):
+    # Act
+    response = client.get("/goals")
+
+    # Assert
+    assert response.get_json() == [
+        {"id": 1, "title": "Build a habit of going outside daily"}]
+
+
+def test_reconcile_command_repairs_drift(app, one_task_belongs_to_one_goal):
+    # Arrange
+    Goal.query.update({Goal.task_count: 7, Goal.completed_count: 3},
+                      synchronize_session=False)
+    db.session.commit()
+
+    # Act
+    result = app.test_cli_runner().invoke(args=["counters", "reconcile"])
+    again = app.test_cli_runner().invoke(args=["counters", "reconcile"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "reconciled 1 goals" in result.output
+    assert "reconciled 0 goals" in again.output
+    goal = Goal.query.get(1)
+    assert (goal.task_count, goal.completed_count) == (1, 0)
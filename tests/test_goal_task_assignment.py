@@ -0,0 +1,89 @@
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+
+
+def test_post_many_task_ids_to_goal_uses_fixed_statements(client, one_goal, sql_statements):
+    # Arrange
+    db.session.add_all([
+        Task(title=f"Task {i}", description="", completed_at=None)
+        for i in range(500)
+    ])
+    db.session.commit()
+    sql_statements.clear()
+
+    # Act
+    response = client.post("/goals/1/tasks", json={
+        "task_ids": list(range(1, 501))
+    })
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["task_ids"] == list(range(1, 501))
+    # the goal, the task ids, the change_seq with the task version bump
+    # (plus a read of it without RETURNING), detach, attach (each a SELECT
+    # and UPDATE without RETURNING, though an empty detach skips its
+    # UPDATE) and the goal counters (after a row lock on Postgres)
+    assert len(sql_statements) == (7 if db.engine.dialect.name == "postgresql" else 8)
+    assert Task.query.filter_by(goal_id=1).count() == 500
+
+
+def test_post_task_ids_to_goal_detaches_previous_tasks(client, one_task_belongs_to_one_goal, three_tasks):
+    # Act
+    response = client.post("/goals/1/tasks", json={
+        "task_ids": [2, 3]
+    })
+
+    # Assert
+    assert response.status_code == 200
+    assert Task.query.get(1).goal_id is None
+    assert [task.task_id for task in Goal.query.get(1).tasks] == [2, 3]
+
+
+def test_post_task_ids_to_goal_reports_every_missing_id(client, one_goal, three_tasks):
+    # Act
+    response = client.post("/goals/1/tasks", json={
+        "task_ids": [1, 7, 2, 9, 7]
+    })
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 404
+    assert response_body == dict(details="Unknown Task ids: 7, 9")
+    assert Task.query.filter_by(goal_id=1).count() == 0
+
+
+def test_post_task_ids_to_goal_one_missing_id(client, one_goal, three_tasks):
+    # Act
+    response = client.post("/goals/1/tasks", json={
+        "task_ids": [1, 7]
+    })
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 404
+    assert response_body == dict(details="Unknown Task id: 7")
+
+
+def test_post_task_ids_to_goal_non_integer_id_is_unknown(client, one_goal, three_tasks):
+    # Act
+    one = client.post("/goals/1/tasks", json={"task_ids": ["one"]})
+    many = client.post("/goals/1/tasks", json={"task_ids": [1, "one", 7, None]})
+    truncated = client.post("/goals/1/tasks", json={"task_ids": [1.9, True]})
+
+    # Assert
+    assert one.status_code == many.status_code == truncated.status_code == 404
+    assert one.get_json() == dict(details="Unknown Task id: one")
+    assert many.get_json() == dict(details="Unknown Task ids: one, 7, None")
+    assert truncated.get_json() == dict(details="Unknown Task ids: 1.9, True")
+    assert Task.query.filter_by(goal_id=1).count() == 0
+
+
+def test_post_task_ids_to_goal_invalid_data(client, one_goal):
+    # Act
+    response = client.post("/goals/1/tasks", json={"tasks": [1]})
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 400
+    assert response_body == dict(details="Invalid data")
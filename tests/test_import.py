@@ -0,0 +1,182 @@
+import json
+from app import db, importer
+from app.models.goal import Goal
+from app.models.import_job import ImportJob
+from app.models.task import Task
+
+
+def ndjson(*records):
+    return "".join(
+        (record if isinstance(record, str) else json.dumps(record)) + "\n"
+        for record in records)
+
+
+def post_ndjson(client, body, path="/import/tasks"):
+    return client.post(path, data=body, content_type="application/x-ndjson")
+
+
+def test_import_ndjson_reports_rejected_rows(client, one_goal):
+    # Arrange
+    body = ndjson(
+        {"title": "A", "description": "", "completed_at": "2024-01-02T03:04:05Z",
+         "goal_id": 1},
+        {"title": "B"},
+        "not json",
+        {"title": "C", "description": "", "goal_id": 99},
+        {"title": "D", "description": "", "goal": "Build a habit of going outside daily"},
+        {"title": "E", "description": "", "goal": "Learn to cook"},
+        {"title": "F", "description": "", "completed_at": "someday"},
+    )
+
+    # Act
+    response = post_ndjson(client, body)
+
+    # Assert
+    assert response.status_code == 201
+    report = response.get_json()["report"]
+    assert report["status"] == "completed"
+    assert (report["rows_read"], report["rows_imported"], report["rows_rejected"]) == (7, 3, 4)
+    assert report["errors"] == [
+        dict(row=2, details="Invalid data"),
+        dict(row=3, details="Invalid data"),
+        dict(row=4, details="Unknown Goal id: 99"),
+        dict(row=7, details="Invalid completed_at"),
+    ]
+
+    tasks = {task.title: task for task in Task.query.all()}
+    assert sorted(tasks) == ["A", "D", "E"]
+    assert tasks["A"].completed_at.isoformat() == "2024-01-02T03:04:05"
+    assert tasks["A"].goal_id == tasks["D"].goal_id == 1
+    assert Goal.query.get(tasks["E"].goal_id).title == "Learn to cook"
+    assert Goal.query.get(1).task_count == 2
+    assert Goal.query.get(1).completed_count == 1
+
+
+def test_import_csv(client):
+    # Arrange
+    body = (
+        "title,description,completed_at,goal\n"
+        'A,"two\nlines",,Garden\n'
+        "B,,,Garden\n"
+        "C,,someday,\n"
+    )
+
+    # Act
+    response = client.post("/import/tasks", data=body, content_type="text/csv")
+
+    # Assert
+    assert response.status_code == 201
+    report = response.get_json()["report"]
+    assert report["format"] == "text/csv"
+    # an empty description is kept; empty completed_at and goal are left out
+    assert report["errors"] == [dict(row=3, details="Invalid completed_at")]
+    tasks = Task.query.order_by(Task.task_id).all()
+    assert [(task.title, task.description) for task in tasks] == [
+        ("A", "two\nlines"), ("B", "")]
+    assert tasks[0].goal_id == tasks[1].goal_id
+    assert tasks[0].completed_at is None
+    assert Goal.query.get(tasks[0].goal_id).title == "Garden"
+
+
+def test_import_resumes_after_failed_batch(app, client, monkeypatch):
+    # Arrange
+    app.config["IMPORT_BATCH_SIZE"] = 2
+    body = ndjson(*({"title": f"Task {i}", "description": ""} for i in range(5)))
+    copy_rows = importer.copy_rows
+    calls = []
+
+    def failing_copy_rows(*args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("connection reset")
+        copy_rows(*args)
+
+    monkeypatch.setattr(importer, "copy_rows", failing_copy_rows)
+
+    # Act
+    failed = post_ndjson(client, body)
+    resumed = post_ndjson(client, body, "/import/tasks?import_id=1")
+
+    # Assert
+    assert failed.status_code == 500
+    assert failed.get_json()["details"] == \
+        "Batch starting at row 3 failed: connection reset"
+    assert failed.get_json()["report"]["rows_read"] == 2
+
+    assert resumed.status_code == 200
+    report = resumed.get_json()["report"]
+    assert (report["status"], report["rows_read"], report["rows_imported"]) == \
+        ("completed", 5, 5)
+    assert [task.title for task in Task.query.order_by(Task.task_id)] == [
+        f"Task {i}" for i in range(5)]
+
+
+def test_import_report(client):
+    # Arrange
+    post_ndjson(client, ndjson({"title": "A", "description": ""}))
+
+    # Act
+    response = client.get("/import/tasks/1")
+
+    # Assert
+    assert response.status_code == 200
+    report = response.get_json()["report"]
+    assert (report["id"], report["status"], report["rows_imported"]) == (1, "completed", 1)
+
+
+def test_import_errors_are_capped(app, client):
+    # Arrange
+    app.config["IMPORT_MAX_ERRORS"] = 2
+
+    # Act
+    response = post_ndjson(client, ndjson(*({"title": "x"} for _ in range(5))))
+
+    # Assert
+    report = response.get_json()["report"]
+    assert report["rows_rejected"] == 5
+    assert [error["row"] for error in report["errors"]] == [1, 2]
+
+
+def test_import_unknown_id(client):
+    # Act
+    report = client.get("/import/tasks/7")
+    resume = post_ndjson(client, ndjson(), "/import/tasks?import_id=7")
+
+    # Assert
+    assert report.status_code == resume.status_code == 404
+    assert report.get_json() == dict(details="Unknown Import id: 7")
+
+
+def test_import_completed_cannot_resume(client):
+    # Arrange
+    post_ndjson(client, ndjson({"title": "A", "description": ""}))
+
+    # Act
+    response = post_ndjson(client, ndjson(), "/import/tasks?import_id=1")
+
+    # Assert
+    assert response.status_code == 409
+    assert Task.query.count() == 1
+
+
+def test_import_running_cannot_resume(client):
+    # Arrange
+    db.session.add(ImportJob(format="application/x-ndjson", errors=[]))
+    db.session.commit()
+
+    # Act
+    response = post_ndjson(
+        client, ndjson({"title": "A", "description": ""}), "/import/tasks?import_id=1")
+
+    # Assert
+    assert response.status_code == 409
+    assert response.get_json() == dict(details="Import 1 is running")
+    assert Task.query.count() == 0
+
+
+def test_import_unsupported_content_type(client):
+    # Act
+    response = client.post("/import/tasks", json=[{"title": "A", "description": ""}])
+
+    # Assert
+    assert response.status_code == 415
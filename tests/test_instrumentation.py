@@ -0,0 +1,115 @@
+import json
+import logging
+import re
+import pytest
+from sqlalchemy.exc import DBAPIError
+from app import create_app, db
+from app.instrumentation import external_call
+from app.models.task import Task
+
+
+@pytest.fixture
+def instrumented_app(monkeypatch):
+    monkeypatch.setenv("INSTRUMENTATION_ENABLED", "1")
+    app = create_app({"TESTING": True})
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Task(title="Task", description="", completed_at=None))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def server_timing(response):
+    metrics = {}
+    for part in response.headers["Server-Timing"].split(", "):
+        name, *params = part.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+def test_server_timing_header(instrumented_app):
+    # Act
+    response = instrumented_app.test_client().get("/tasks")
+
+    # Assert
+    metrics = server_timing(response)
+    assert set(metrics) == {"db", "serialize", "http", "app", "total"}
+    assert re.fullmatch(r'"\d+ queries"', metrics["db"]["desc"])
+    assert int(metrics["db"]["desc"].strip('"').split()[0]) >= 1
+    assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+    assert float(metrics["serialize"]["dur"]) > 0
+
+
+def test_structured_log_line(instrumented_app, caplog):
+    # Act
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        instrumented_app.test_client().get("/tasks/1")
+
+    # Assert
+    (record,) = [r for r in caplog.records if r.name == "app.requests"]
+    line = json.loads(record.getMessage())
+    assert line["endpoint"] == "task.get_one_task"
+    assert line["status"] == 200
+    assert line["queries"] >= 1
+    assert {"db_ms", "serialize_ms", "http_ms", "app_ms", "total_ms"} <= set(line)
+
+
+def test_external_calls_are_timed(instrumented_app):
+    # Arrange
+    @instrumented_app.route("/external")
+    def external():
+        with external_call():
+            pass
+        return {}
+
+    # Act
+    response = instrumented_app.test_client().get("/external")
+
+    # Assert
+    assert "http" in server_timing(response)
+
+
+def test_failed_statements_pop_their_timers(instrumented_app):
+    # Arrange
+    @instrumented_app.route("/failing")
+    def failing():
+        connection = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                connection.execute("SELECT * FROM no_such_table")
+        return dict(pending=len(connection.info["query_started"]))
+
+    # Act
+    response = instrumented_app.test_client().get("/failing")
+
+    # Assert
+    assert response.get_json() == dict(pending=0)
+
+
+def test_sample_rate_zero_skips_requests(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("INSTRUMENTATION_ENABLED", "1")
+    monkeypatch.setenv("INSTRUMENTATION_SAMPLE_RATE", "0")
+    app = create_app({"TESTING": True})
+
+    # Act
+    with app.app_context():
+        db.create_all()
+        response = app.test_client().get("/tasks")
+        db.session.remove()
+        db.drop_all()
+
+    # Assert
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+
+def test_disabled_by_default(client):
+    # Act
+    response = client.get("/tasks")
+
+    # Assert
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,125 @@
+import pytest
+from app import db
+from app.models.goal import Goal
+from app.models.notification import Notification
+from app.models.task import Task
+
+
+@pytest.fixture
+def many_tasks(app):
+    db.session.add(Goal(title="Chores"))
+    db.session.add_all([
+        Task(title=f"Task {i}", description="", completed_at=None,
+             goal_id=1 if i % 2 else None)
+        for i in range(1, 51)
+    ])
+    db.session.commit()
+
+
+def test_mark_many_complete_by_ids_reports_missing(client, many_tasks):
+    # Act
+    response = client.patch("/tasks/mark_complete", json={
+        "task_ids": [3, 1, 99, 2, 3, 98]
+    })
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == dict(task_ids=[1, 2, 3], missing_ids=[99, 98])
+    assert [task.task_id for task in Task.query.filter(
+        Task.completed_at.isnot(None))] == [1, 2, 3]
+
+
+def test_mark_many_uses_fixed_statements(client, many_tasks, sql_statements):
+    # Act
+    response = client.patch("/tasks/mark_complete", json={
+        "task_ids": list(range(1, 51))
+    })
+
+    # Assert
+    assert response.status_code == 200
+    assert len(response.get_json()["task_ids"]) == 50
+    # change_seq with the task version bump, UPDATE ... RETURNING, goal
+    # lock and goal counter deltas on Postgres; elsewhere the change_seq
+    # and the marked rows are read back and there is no lock
+    assert len(sql_statements) == (4 if db.engine.dialect.name == "postgresql" else 5)
+
+
+def test_mark_many_by_filter(client, many_tasks):
+    # Act
+    response = client.patch("/tasks/mark_complete", json={
+        "filter": {"goal_id": 1, "title_prefix": "Task 1"}
+    })
+
+    # Assert
+    assert response.get_json() == dict(task_ids=[1, 11, 13, 15, 17, 19])
+    assert client.get("/goals/1/progress").get_json()["completed_count"] == 6
+
+
+def test_mark_many_incomplete(client, many_tasks):
+    # Arrange
+    client.patch("/tasks/mark_complete", json={"task_ids": [1, 2, 3]})
+    client.get("/tasks/2")
+
+    # Act
+    response = client.patch("/tasks/mark_incomplete", json={
+        "filter": {"is_complete": True}
+    })
+
+    # Assert
+    assert response.get_json() == dict(task_ids=[1, 2, 3])
+    assert client.get("/tasks/2").get_json()["task"]["is_complete"] is False
+    assert client.get("/goals/1/progress").get_json()["completed_count"] == 0
+
+
+def test_mark_many_complete_sends_one_summary(client, app, many_tasks):
+    # Arrange
+    app.config["SLACK_BOT_TOKEN"] = "test-token"
+
+    # Act
+    client.patch("/tasks/mark_complete", json={"task_ids": list(range(1, 31))})
+    client.patch("/tasks/mark_incomplete", json={"task_ids": [1]})
+    client.patch("/tasks/mark_complete", json={"task_ids": [1]})
+
+    # Assert
+    texts = [notification.text for notification in
+             Notification.query.order_by(Notification.notification_id)]
+    assert len(texts) == 2
+    assert texts[0].startswith('30 tasks have been marked complete: "Task 1", "Task 2"')
+    assert texts[0].endswith('"Task 20" and 10 more')
+    assert texts[1] == 'Task "Task 1" has been marked complete'
+
+
+@pytest.mark.parametrize("body", [
+    None,
+    [1, 2],
+    {},
+    {"task_ids": ["a"]},
+    {"task_ids": 5},
+    {"task_ids": "12"},
+    {"task_ids": {"1": 1}},
+    {"task_ids": [2.7]},
+    {"task_ids": [True]},
+    {"task_ids": ["1"]},
+    {"filter": {}},
+    {"filter": {"title_prefix": ""}},
+    {"filter": {"color": "red"}},
+])
+def test_mark_many_invalid_data(client, many_tasks, body):
+    # Act
+    response = client.patch("/tasks/mark_complete", json=body)
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"details": "Invalid data"}
+    assert Task.query.filter(Task.completed_at.isnot(None)).count() == 0
+
+
+def test_mark_many_invalid_filter_value(client, many_tasks):
+    # Act
+    response = client.patch("/tasks/mark_complete", json={
+        "filter": {"goal_id": "abc"}
+    })
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"details": "Invalid goal_id"}
@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import time
+import pytest
+from app import create_app, db
+from app.metrics import MetricsStore
+
+
+@pytest.fixture
+def multiproc_app(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setenv("METRICS_FLUSH_INTERVAL", "0.05")
+    app = create_app({"TESTING": True})
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def worker_files(directory, timeout=2):
+    # the flusher thread writes them in the background
+    deadline = time.monotonic() + timeout
+    while True:
+        files = [name for name in os.listdir(directory)
+                 if name.startswith("metrics_") and name.endswith(".json")]
+        if files or time.monotonic() > deadline:
+            return files
+        time.sleep(0.01)
+
+
+def sample(body, line):
+    match = re.search(rf"^{re.escape(line)} (\S+)$", body, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_counts_requests_by_endpoint_and_status(client, one_task):
+    # Act
+    client.get("/tasks")
+    client.get("/tasks/1")
+    client.get("/tasks/999")
+    response = client.get("/metrics")
+
+    # Assert
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert sample(body, 'http_requests_total{endpoint="task.task_index",method="GET",status="200"}') == 1
+    assert sample(body, 'http_requests_total{endpoint="task.get_one_task",method="GET",status="200"}') == 1
+    assert sample(body, 'http_requests_total{endpoint="task.get_one_task",method="GET",status="404"}') == 1
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert sample(body, 'http_request_duration_seconds_bucket{endpoint="task.get_one_task",method="GET",le="+Inf"}') == 2
+    assert sample(body, 'http_request_duration_seconds_count{endpoint="task.get_one_task",method="GET"}') == 2
+    assert sample(body, "cache_misses_total") >= 1
+
+
+def test_metrics_histogram_buckets_are_cumulative():
+    # Arrange
+    store = MetricsStore()
+
+    # Act
+    store.observe("http_request_duration_seconds", 0.003, dict(endpoint="a"))
+    store.observe("http_request_duration_seconds", 0.2, dict(endpoint="a"))
+    store.observe("http_request_duration_seconds", 60, dict(endpoint="a"))
+    body = store.render()
+
+    # Assert
+    assert sample(body, 'http_request_duration_seconds_bucket{endpoint="a",le="0.005"}') == 1
+    assert sample(body, 'http_request_duration_seconds_bucket{endpoint="a",le="0.25"}') == 2
+    assert sample(body, 'http_request_duration_seconds_bucket{endpoint="a",le="10"}') == 2
+    assert sample(body, 'http_request_duration_seconds_bucket{endpoint="a",le="+Inf"}') == 3
+    assert sample(body, 'http_request_duration_seconds_sum{endpoint="a"}') == pytest.approx(60.203)
+
+
+def test_metrics_aggregate_across_worker_files(tmp_path):
+    # Arrange
+    worker = MetricsStore(str(tmp_path))
+    worker.process_id = "worker"
+    scraper = MetricsStore(str(tmp_path))
+    worker.inc("http_requests_total", dict(endpoint="task.task_index"), 3)
+    worker.observe("slack_request_duration_seconds", 0.1, dict(status="200"))
+    scraper.inc("http_requests_total", dict(endpoint="task.task_index"), 2)
+
+    # Act
+    worker.flush(force=True)
+    body = scraper.render()
+
+    # Assert
+    assert sample(body, 'http_requests_total{endpoint="task.task_index"}') == 5
+    assert sample(body, 'slack_request_duration_seconds_count{status="200"}') == 1
+
+
+def test_metrics_drop_gauges_of_dead_workers(tmp_path):
+    # Arrange
+    with open(tmp_path / "metrics_dead.json", "w") as file:
+        json.dump(dict(
+            pid=2 ** 22 + 1,
+            counters=[["http_requests_total", [], 4]],
+            histograms=[],
+            gauges=[["db_pool_checked_out", [], 3]],
+        ), file)
+    store = MetricsStore(str(tmp_path))
+    store.set_gauge("db_pool_checked_out", 1)
+
+    # Act
+    body = store.render()
+
+    # Assert
+    assert sample(body, "http_requests_total") == 4
+    assert sample(body, f'db_pool_checked_out{{pid="{os.getpid()}"}}') == 1
+    assert f'pid="{2 ** 22 + 1}"' not in body
+
+
+def test_metrics_flush_writes_worker_file(multiproc_app, tmp_path):
+    # Act
+    multiproc_app.test_client().get("/tasks")
+
+    # Assert
+    files = worker_files(tmp_path)
+    assert len(files) == 1
+    with open(tmp_path / files[0]) as file:
+        data = json.load(file)
+    assert ["http_requests_total",
+            [["endpoint", "task.task_index"], ["method", "GET"], ["status", "200"]],
+            1] in data["counters"]
+
+
+def test_metrics_forked_workers_write_their_own_files(tmp_path):
+    # Arrange
+    store = MetricsStore(str(tmp_path))
+    store.inc("http_requests_total", value=1)
+
+    # Act
+    for _ in range(2):
+        pid = os.fork()
+        if pid == 0:
+            store.inc("http_requests_total", value=10)
+            store.flush(force=True)
+            os._exit(0)
+        os.waitpid(pid, 0)
+    files = [name for name in os.listdir(tmp_path) if name.endswith(".json")]
+    body = store.render()
+
+    # Assert
+    assert len(files) == 2
+    assert sample(body, "http_requests_total") == 21
+
+
+def test_metrics_idle_worker_is_flushed_in_the_background(tmp_path):
+    # Arrange
+    store = MetricsStore(str(tmp_path), flush_interval=0.05)
+
+    # Act
+    store.inc("http_requests_total", value=2)
+    files = worker_files(tmp_path)
+
+    # Assert
+    assert files == [os.path.basename(store.path())]
+
+
+def test_metrics_fold_dead_worker_files_into_archive(tmp_path):
+    # Arrange
+    for name, value in (("metrics_dead_1.json", 4), ("metrics_dead_2.json", 5)):
+        with open(tmp_path / name, "w") as file:
+            json.dump(dict(
+                pid=2 ** 22 + 1,
+                counters=[["http_requests_total", [], value]],
+                histograms=[["slack_request_duration_seconds", [],
+                             dict(buckets=[1], counts=[1], sum=0.5, count=1)]],
+                gauges=[],
+            ), file)
+    store = MetricsStore(str(tmp_path))
+
+    # Act
+    first = store.render()
+    second = store.render()
+
+    # Assert
+    files = sorted(name for name in os.listdir(tmp_path) if name.endswith(".json"))
+    assert files == ["metrics_archive.json"]
+    assert sample(first, "http_requests_total") == 9
+    assert sample(second, "http_requests_total") == 9
+    assert sample(second, "slack_request_duration_seconds_count") == 2
@@ -0,0 +1,190 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs
+import pytest
+from app import db
+from app.models.notification import Notification
+from app.outbox import SlackClient, drain
+
+
+class StubSlack(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        body = parse_qs(self.rfile.read(length).decode())
+        self.server.received.append(dict(
+            authorization=self.headers["Authorization"],
+            channel=body["channel"][0],
+            text=body["text"][0],
+        ))
+
+        status, headers = self.server.replies.pop(0) if self.server.replies else (200, {})
+        payload = json.dumps(dict(ok=status == 200)).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slack(app):
+    server = HTTPServer(("127.0.0.1", 0), StubSlack)
+    server.received = []
+    server.replies = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    app.config["SLACK_BOT_TOKEN"] = "test-token"
+    app.config["SLACK_API_URL"] = f"http://127.0.0.1:{server.server_port}/api/chat.postMessage"
+    client = SlackClient.from_config(app.config)
+
+    yield server, client
+
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def three_tasks_completed(client, slack, three_tasks):
+    for task_id in (1, 2, 3):
+        client.patch(f"/tasks/{task_id}/mark_complete")
+
+
+def test_mark_complete_enqueues_without_calling_slack(client, slack, one_task):
+    # Arrange
+    server, _ = slack
+
+    # Act
+    response = client.patch("/tasks/1/mark_complete")
+
+    # Assert
+    assert response.status_code == 200
+    assert server.received == []
+    notification = Notification.query.one()
+    assert notification.channel == "task-notifications-demo"
+    assert notification.text == 'Task "Go on my daily walk 🏞" has been marked complete'
+    assert notification.sent_at is None
+
+
+def test_mark_complete_without_token_enqueues_nothing(client, one_task):
+    # Act
+    response = client.patch("/tasks/1/mark_complete")
+
+    # Assert
+    assert response.status_code == 200
+    assert Notification.query.count() == 0
+
+
+def test_drain_merges_burst_into_one_message(app, slack, three_tasks_completed):
+    # Arrange
+    server, slack_client = slack
+
+    # Act
+    totals = drain(slack_client)
+
+    # Assert
+    assert totals["sent"] == 3
+    assert len(server.received) == 1
+    assert server.received[0]["authorization"] == "Bearer test-token"
+    assert server.received[0]["text"].splitlines() == [
+        'Task "Water the garden 🌷" has been marked complete',
+        'Task "Answer forgotten email 📧" has been marked complete',
+        'Task "Pay my outstanding tickets 😭" has been marked complete',
+    ]
+    assert Notification.query.filter(Notification.sent_at.is_(None)).count() == 0
+
+    # Act
+    totals = drain(slack_client)
+
+    # Assert
+    assert totals["sent"] == 0
+    assert len(server.received) == 1
+
+
+def test_drain_honors_retry_after(app, slack, three_tasks_completed):
+    # Arrange
+    server, slack_client = slack
+    server.replies.append((429, {"Retry-After": "120"}))
+    before = datetime.datetime.utcnow()
+
+    # Act
+    totals = drain(slack_client)
+
+    # Assert
+    assert totals["retried"] == 3
+    assert totals["retry_after"] == 120
+    for notification in Notification.query.all():
+        assert notification.attempts == 1
+        assert notification.sent_at is None
+        assert notification.next_attempt_at >= before + datetime.timedelta(seconds=120)
+
+    # Act
+    totals = drain(slack_client)
+
+    # Assert
+    assert totals["sent"] == 0
+    assert len(server.received) == 1
+
+
+def test_drain_backs_off_then_gives_up(app, slack, three_tasks_completed):
+    # Arrange
+    server, slack_client = slack
+    app.config["OUTBOX_MAX_ATTEMPTS"] = 2
+    server.replies.extend([(503, {}), (503, {})])
+
+    # Act
+    drain(slack_client)
+
+    # Assert
+    notification = Notification.query.first()
+    assert notification.attempts == 1
+    assert notification.last_error == "HTTP 503"
+    assert notification.next_attempt_at > datetime.datetime.utcnow()
+
+    # Arrange
+    Notification.query.update(
+        {Notification.next_attempt_at: datetime.datetime.utcnow()})
+    db.session.commit()
+
+    # Act
+    totals = drain(slack_client)
+
+    # Assert
+    assert totals["failed"] == 3
+    assert len(server.received) == 2
+    assert Notification.query.filter(
+        Notification.next_attempt_at.isnot(None)).count() == 0
+
+
+def test_drain_command(app, slack, three_tasks_completed):
+    # Arrange
+    server, _ = slack
+
+    # Act
+    result = app.test_cli_runner().invoke(args=["outbox", "drain"])
+
+    # Assert
+    assert result.exit_code == 0
+    assert "sent=3" in result.output
+    assert len(server.received) == 1
+
+
+def test_drain_records_slack_latency(app, slack, three_tasks_completed):
+    # Arrange
+    server, slack_client = slack
+    server.replies.append((500, {}))
+
+    # Act
+    drain(slack_client)
+
+    # Assert
+    histograms = app.extensions["metrics"].histograms
+    assert histograms[("slack_request_duration_seconds", (("status", "500"),))]["count"] == 1
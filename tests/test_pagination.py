@@ -0,0 +1,128 @@
+import pytest
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+
+
+def test_get_tasks_paginated_by_id(client, five_tasks):
+    # Act
+    response = client.get("/tasks?limit=2")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert [task["id"] for task in response_body["tasks"]] == [1, 2]
+    assert response_body["next_cursor"]
+    assert response.headers["Next-Cursor"] == response_body["next_cursor"]
+
+    # Act
+    ids = [task["id"] for task in response_body["tasks"]]
+    while response_body["next_cursor"]:
+        response = client.get(
+            f"/tasks?limit=2&cursor={response_body['next_cursor']}")
+        response_body = response.get_json()
+        ids.extend(task["id"] for task in response_body["tasks"])
+
+    # Assert
+    assert ids == [1, 2, 3, 4, 5]
+    assert "Next-Cursor" not in response.headers
+
+
+@pytest.mark.parametrize("sort_dir, expected", [
+    ("asc", ["A", "B", "C", "D", "E"]),
+    ("desc", ["E", "D", "C", "B", "A"]),
+])
+def test_get_tasks_paginated_sorted_by_title(client, five_tasks, sort_dir, expected):
+    # Act
+    titles = []
+    cursor = ""
+    while True:
+        response = client.get(
+            f"/tasks?sort={sort_dir}&limit=2&cursor={cursor}")
+        response_body = response.get_json()
+        titles.extend(task["title"] for task in response_body["tasks"])
+        cursor = response_body["next_cursor"]
+        if not cursor:
+            break
+
+    # Assert
+    assert titles == expected
+
+
+def test_get_tasks_sorted_title_ties_broken_by_id(client, app):
+    # Arrange
+    db.session.add_all([
+        Task(title="Same", description="", completed_at=None)
+        for _ in range(3)
+    ])
+    db.session.commit()
+
+    # Act
+    first = client.get("/tasks?sort=asc&limit=2").get_json()
+    second = client.get(
+        f"/tasks?sort=asc&limit=2&cursor={first['next_cursor']}").get_json()
+
+    # Assert
+    assert [task["id"] for task in first["tasks"]] == [1, 2]
+    assert [task["id"] for task in second["tasks"]] == [3]
+    assert second["next_cursor"] is None
+
+
+def test_get_tasks_unpaginated_is_capped(client, app, five_tasks):
+    # Arrange
+    app.config["MAX_PAGE_SIZE"] = 3
+
+    # Act
+    response = client.get("/tasks")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 200
+    assert [task["id"] for task in response_body] == [1, 2, 3]
+    assert "Next-Cursor" in response.headers
+
+
+def test_get_tasks_limit_above_cap_is_clamped(client, app, five_tasks):
+    # Arrange
+    app.config["MAX_PAGE_SIZE"] = 3
+
+    # Act
+    response = client.get("/tasks?limit=50")
+    response_body = response.get_json()
+
+    # Assert
+    assert len(response_body["tasks"]) == 3
+
+
+@pytest.mark.parametrize("query, details", [
+    ("limit=0", "Invalid limit"),
+    ("limit=abc", "Invalid limit"),
+    ("cursor=not-a-cursor", "Invalid cursor"),
+    ("sort=asc&cursor=WzFd", "Invalid cursor"),
+])
+def test_get_tasks_invalid_pagination(client, five_tasks, query, details):
+    # Act
+    response = client.get(f"/tasks?{query}")
+    response_body = response.get_json()
+
+    # Assert
+    assert response.status_code == 400
+    assert response_body == dict(details=details)
+
+
+def test_get_goals_paginated(client, app):
+    # Arrange
+    db.session.add_all([Goal(title=f"Goal {i}") for i in range(3)])
+    db.session.commit()
+
+    # Act
+    first = client.get("/goals?limit=2").get_json()
+    second = client.get(
+        f"/goals?limit=2&cursor={first['next_cursor']}").get_json()
+
+    # Assert
+    assert [goal["id"] for goal in first["goals"]] == [1, 2]
+    assert second == {
+        "goals": [{"id": 3, "title": "Goal 2"}],
+        "next_cursor": None,
+    }
@@ -0,0 +1,58 @@
+from datetime import datetime
+import pytest
+from flask import jsonify
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+
+
+@pytest.fixture
+def mixed_tasks(app, one_goal):
+    db.session.add_all([
+        Task(title="Plain 🌷", description="", completed_at=None),
+        Task(title="Done", description="with \"quotes\"",
+             completed_at=datetime(2024, 1, 2, 3, 4, 5)),
+        Task(title="In goal", description="x", completed_at=None, goal_id=1),
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize("url", ["/tasks", "/tasks?sort=asc", "/tasks?stream=1"])
+def test_projected_task_list_matches_orm_serialization(client, mixed_tasks, url):
+    # Arrange
+    tasks = Task.query.order_by(Task.task_id).all()
+    if "sort" in url:
+        tasks.sort(key=lambda task: (task.title, task.task_id))
+    expected = jsonify([task.to_dict() for task in tasks]).get_data()
+
+    # Act
+    response = client.get(url)
+
+    # Assert
+    assert response.get_data() == expected
+
+
+@pytest.mark.parametrize("task_id", [1, 2, 3])
+def test_projected_task_detail_matches_orm_serialization(client, mixed_tasks, task_id):
+    # Arrange
+    expected = jsonify(dict(task=Task.query.get(task_id).to_dict())).get_data()
+
+    # Act
+    response = client.get(f"/tasks/{task_id}")
+
+    # Assert
+    assert response.get_data() == expected
+
+
+def test_projected_goals_match_orm_serialization(client, one_goal):
+    # Arrange
+    expected_list = jsonify([Goal.query.get(1).to_dict()]).get_data()
+    expected_detail = jsonify(dict(goal=Goal.query.get(1).to_dict())).get_data()
+
+    # Act
+    list_response = client.get("/goals")
+    detail_response = client.get("/goals/1")
+
+    # Assert
+    assert list_response.get_data() == expected_list
+    assert detail_response.get_data() == expected_detail
@@ -0,0 +1,92 @@
+import json
+import pytest
+from sqlalchemy import event
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+
+
+@pytest.fixture
+def seeded(app):
+    db.session.execute(Goal.__table__.insert(), [
+        dict(title=f"Goal {i}") for i in range(10)
+    ])
+    db.session.execute(Task.__table__.insert(), [
+        dict(title=f"Task {i % 37}", description="", goal_id=i % 10 + 1)
+        for i in range(500)
+    ])
+    db.session.commit()
+
+
+@pytest.fixture
+def captured_queries(app):
+    queries = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield queries
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+def plan_problems(statement, parameters):
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if db.engine.dialect.name == "postgresql":
+            # a tiny fixture table is always cheapest to seq scan, so make
+            # the planner show what it does when an index is available
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = json.dumps(cursor.fetchone()[0])
+            cursor.execute("RESET enable_seqscan")
+            return [node for node in ("Seq Scan", '"Sort"')
+                    if node in plan and "task" in plan]
+
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        details = [row[-1] for row in cursor.fetchall()]
+        return [
+            detail for detail in details
+            if detail == "SCAN task" or "TEMP B-TREE" in detail
+        ]
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("url", [
+    "/tasks?sort=asc&limit=5",
+    "/tasks?sort=desc&limit=5",
+    "/tasks?limit=5&cursor=WzEwMF0",
+    "/tasks?goal_id=3&limit=5",
+    "/tasks?title_prefix=Task%201&sort=asc&limit=5",
+    "/goals/3/tasks",
+    "/changes?since=1&limit=5",
+    "/export/tasks?updated_since=1",
+])
+def test_hot_routes_use_indexes(client, seeded, captured_queries, url):
+    # Act
+    response = client.get(url)
+
+    # Assert
+    assert response.status_code == 200
+    assert captured_queries
+    for statement, parameters in captured_queries:
+        assert plan_problems(statement, parameters) == [], statement
+
+
+@pytest.mark.parametrize("sort_dir", ["asc", "desc"])
+def test_sorted_task_page_seeks_past_cursor(client, seeded, captured_queries, sort_dir):
+    # Arrange
+    first = client.get(f"/tasks?sort={sort_dir}&limit=5").get_json()
+    captured_queries.clear()
+
+    # Act
+    response = client.get(
+        f"/tasks?sort={sort_dir}&limit=5&cursor={first['next_cursor']}")
+
+    # Assert
+    assert response.status_code == 200
+    for statement, parameters in captured_queries:
+        assert plan_problems(statement, parameters) == [], statement
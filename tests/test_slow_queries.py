@@ -0,0 +1,141 @@
+import json
+import logging
+import pytest
+from sqlalchemy.exc import DBAPIError
+from app import create_app, db
+from app.models.task import Task
+from app.slow_queries import SlowQueryLog, fingerprint, normalize, param_shapes
+
+
+@pytest.fixture
+def slow_app(monkeypatch):
+    # every statement counts as slow
+    monkeypatch.setenv("SLOW_QUERY_THRESHOLD_MS", "0.000001")
+    app = create_app({"TESTING": True})
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Task(title="Task", description="", completed_at=None))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_normalize_collapses_literals_and_lists():
+    # Act
+    first = normalize("SELECT * FROM task WHERE task.task_id IN (?, ?, ?) AND title = 'a'")
+    second = normalize("SELECT *  FROM task\nWHERE task.task_id IN (%(id_1)s) AND title = 'it''s'")
+
+    # Assert
+    assert first == "SELECT * FROM task WHERE task.task_id IN (...) AND title = ?"
+    assert first == second
+    assert fingerprint(first) == fingerprint(second)
+    assert normalize("INSERT INTO goal (title) VALUES (?), (?), (?)") == \
+        "INSERT INTO goal (title) VALUES (?), ..."
+
+
+def test_param_shapes():
+    # Assert
+    assert param_shapes({"title": "a", "task_id": 1}) == {"title": "str", "task_id": "int"}
+    assert param_shapes((1, None)) == ["int", "NoneType"]
+    assert param_shapes([(1,), (2,)], executemany=True) == dict(rows=2, row=["int"])
+
+
+def test_slow_query_log_dedupes_by_fingerprint():
+    # Arrange
+    now = [0.0]
+    log = SlowQueryLog(100, window=60, clock=lambda: now[0])
+
+    # Act
+    log.record("SELECT 1 FROM task WHERE task_id = ?", (1,), 0.5, "task.get_one_task")
+    log.record("SELECT 1 FROM task WHERE task_id = ?", (2,), 0.3, "task.get_one_task")
+    log.record("SELECT 1 FROM task WHERE task_id = ?", (3,), 0.05, "task.get_one_task")
+    now[0] = 120.0
+    log.record("SELECT 1 FROM task WHERE task_id = ?", (4,), 0.2, "task.update_task")
+
+    # Assert
+    entries = log.to_list()
+    assert len(entries) == 1
+    assert entries[0]["count"] == 3
+    assert entries[0]["count_in_window"] == 1
+    assert entries[0]["max_ms"] == 500
+    assert entries[0]["endpoints"] == {"task.get_one_task": 2, "task.update_task": 1}
+
+
+def test_slow_query_log_explains_each_fingerprint_once():
+    # Arrange
+    explained = []
+
+    def explain(statement, parameters):
+        explained.append(parameters)
+        return "Seq Scan on task"
+
+    log = SlowQueryLog(0, explain=explain)
+
+    # Act
+    log.record("SELECT * FROM task WHERE task_id = ?", (1,), 1.0)
+    log.record("SELECT * FROM task WHERE task_id = ?", (2,), 1.0)
+    log.executor.shutdown(wait=True)
+
+    # Assert
+    assert explained == [(1,)]
+    assert log.to_list()[0]["plan"] == "Seq Scan on task"
+
+
+def test_slow_queries_logged_with_route(slow_app, caplog):
+    # Act
+    with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+        slow_app.test_client().get("/tasks/1")
+
+    # Assert
+    records = [json.loads(record.getMessage()) for record in caplog.records]
+    task_selects = [record for record in records
+                    if record["sql"].startswith("SELECT task.task_id")]
+    assert task_selects
+    assert task_selects[0]["endpoint"] == "task.get_one_task"
+    assert task_selects[0]["params"][0] == "int"
+
+
+def test_slow_queries_stats_route(slow_app):
+    # Arrange
+    client = slow_app.test_client()
+    client.get("/tasks/1")
+    slow_app.extensions["cache"].delete("task:1")
+    client.get("/tasks/1")
+
+    # Act
+    response = client.get("/stats/slow_queries")
+
+    # Assert
+    entries = response.get_json()
+    assert response.status_code == 200
+    lookup = [entry for entry in entries
+              if entry["endpoints"].get("task.get_one_task")
+              and entry["sql"].startswith("SELECT task.task_id")]
+    assert len(lookup) == 1
+    assert lookup[0]["count"] == 2
+
+
+def test_slow_queries_off_by_threshold(monkeypatch):
+    # Arrange
+    monkeypatch.setenv("SLOW_QUERY_THRESHOLD_MS", "0")
+
+    # Act
+    app = create_app({"TESTING": True})
+
+    # Assert
+    assert "slow_queries" not in app.extensions
+
+
+def test_failed_statement_pops_its_timer(slow_app):
+    # Arrange
+    connection = db.session.connection()
+
+    # Act
+    for _ in range(3):
+        with pytest.raises(DBAPIError):
+            connection.execute("SELECT * FROM no_such_table")
+
+    # Assert
+    assert connection.info["slow_query_started"] == []
@@ -0,0 +1,49 @@
+
+
+def test_stream_tasks_no_saved_tasks(client):
+    # Act
+    response = client.get("/tasks?stream=1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.get_json() == []
+
+
+def test_stream_tasks_matches_list(client, app, five_tasks):
+    # Arrange
+    app.config["STREAM_BATCH_SIZE"] = 2
+
+    # Act
+    streamed = client.get("/tasks?stream=1")
+    listed = client.get("/tasks")
+
+    # Assert
+    assert streamed.status_code == 200
+    assert streamed.is_streamed
+    assert streamed.mimetype == "application/json"
+    assert streamed.get_data() == listed.get_data()
+
+
+def test_stream_tasks_sorted(client, app, five_tasks):
+    # Arrange
+    app.config["STREAM_BATCH_SIZE"] = 2
+
+    # Act
+    response = client.get("/tasks?stream=1&sort=desc")
+    response_body = response.get_json()
+
+    # Assert
+    assert [task["title"] for task in response_body] == ["E", "D", "C", "B", "A"]
+
+
+def test_stream_tasks_is_not_capped(client, app, five_tasks):
+    # Arrange
+    app.config["MAX_PAGE_SIZE"] = 2
+    app.config["STREAM_BATCH_SIZE"] = 2
+
+    # Act
+    response = client.get("/tasks?stream=1")
+
+    # Assert
+    assert len(response.get_json()) == 5
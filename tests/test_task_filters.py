@@ -0,0 +1,78 @@
+import datetime
+import pytest
+from app import db
+from app.models.goal import Goal
+from app.models.task import Task
+from tests.conftest import ids
+
+
+@pytest.fixture
+def filter_tasks(app):
+    db.session.add_all([Goal(title="Home"), Goal(title="Work")])
+    db.session.add_all([
+        Task(title="Water the garden", description="", goal_id=1,
+             completed_at=datetime.datetime(2026, 1, 10, 12, 0)),
+        Task(title="Wash the car", description="", goal_id=1, completed_at=None),
+        Task(title="Write the report", description="", goal_id=2,
+             completed_at=datetime.datetime(2026, 3, 1, 9, 30)),
+        Task(title="water plants", description="", completed_at=None),
+        Task(title="W%_ literal", description="", completed_at=None),
+    ])
+    db.session.commit()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("is_complete=true", [1, 3]),
+    ("is_complete=false", [2, 4, 5]),
+    ("goal_id=1", [1, 2]),
+    ("goal_id=none", [4, 5]),
+    ("completed_after=2026-02-01", [3]),
+    ("completed_before=2026-02-01T00:00:00Z", [1]),
+    ("completed_after=2026-01-10T12:00:00&completed_before=2026-03-01T09:30:00", [1]),
+    ("title_prefix=Wa", [1, 2]),
+    ("title_prefix=wa", [4]),
+    ("title_prefix=W%25_", [5]),
+    ("goal_id=1&is_complete=false", [2]),
+])
+def test_get_tasks_filters(client, filter_tasks, query, expected):
+    # Act
+    response = client.get(f"/tasks?{query}")
+
+    # Assert
+    assert response.status_code == 200
+    assert ids(response) == expected
+
+
+def test_get_tasks_filters_compose_with_sort_and_pages(client, filter_tasks):
+    # Act
+    first = client.get("/tasks?title_prefix=W&sort=desc&limit=2")
+    second = client.get(
+        f"/tasks?title_prefix=W&sort=desc&limit=2&cursor={first.get_json()['next_cursor']}")
+
+    # Assert
+    assert ids(first) == [3, 1]
+    assert ids(second) == [2, 5]
+    assert second.get_json()["next_cursor"] is None
+
+
+def test_get_tasks_filters_apply_to_stream(client, filter_tasks):
+    # Act
+    response = client.get("/tasks?stream=1&is_complete=true")
+
+    # Assert
+    assert ids(response) == [1, 3]
+
+
+@pytest.mark.parametrize("query, details", [
+    ("is_complete=maybe", "Invalid is_complete"),
+    ("goal_id=abc", "Invalid goal_id"),
+    ("completed_after=yesterday", "Invalid completed_after"),
+    ("completed_before=2026-13-01", "Invalid completed_before"),
+])
+def test_get_tasks_invalid_filter(client, filter_tasks, query, details):
+    # Act
+    response = client.get(f"/tasks?{query}")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"details": details}
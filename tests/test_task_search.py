@@ -0,0 +1,88 @@
+import pytest
+from app import db
+from app.models.task import Task
+from tests.conftest import ids
+
+
+@pytest.fixture
+def searchable_tasks(app):
+    db.session.add_all([
+        Task(title="Water the garden", description="", completed_at=None),
+        Task(title="Plan the garden party", description="", completed_at=None),
+        Task(title="Pay tickets", description="Before the garden closes", completed_at=None),
+        Task(title="Answer email", description="", completed_at=None),
+    ])
+    db.session.commit()
+
+
+def test_search_ranks_title_matches_first(client, searchable_tasks):
+    # Act
+    response = client.get("/tasks/search?q=garden")
+
+    # Assert
+    assert response.status_code == 200
+    assert ids(response) == [1, 2, 3]
+    assert response.get_json()["tasks"][0] == {
+        "id": 1,
+        "title": "Water the garden",
+        "description": "",
+        "is_complete": False,
+    }
+
+
+def test_search_matches_all_terms_and_stems(client, searchable_tasks):
+    # Act
+    response = client.get("/tasks/search?q=watering gardens")
+
+    # Assert
+    assert ids(response) == [1]
+
+
+def test_search_sees_updates_and_deletes(client, searchable_tasks):
+    # Act
+    client.put("/tasks/4", json={"title": "Weed the garden", "description": ""})
+    client.delete("/tasks/1")
+    response = client.get("/tasks/search?q=garden")
+
+    # Assert
+    assert sorted(ids(response)) == [2, 3, 4]
+
+
+def test_search_sees_bulk_inserts(client, searchable_tasks):
+    # Act
+    client.post("/tasks/bulk", json=[{"title": "Compost heap", "description": ""}])
+    response = client.get("/tasks/search?q=compost")
+
+    # Assert
+    assert ids(response) == [5]
+
+
+def test_search_composes_with_filters_and_limit(client, searchable_tasks):
+    # Arrange
+    client.patch("/tasks/2/mark_complete")
+
+    # Act
+    completed = client.get("/tasks/search?q=garden&is_complete=true")
+    limited = client.get("/tasks/search?q=garden&limit=1")
+
+    # Assert
+    assert ids(completed) == [2]
+    assert ids(limited) == [1]
+
+
+@pytest.mark.parametrize("q", ['"garden', "garden OR", "NEAR(", "*"])
+def test_search_treats_syntax_as_text(client, searchable_tasks, q):
+    # Act
+    response = client.get("/tasks/search", query_string={"q": q})
+
+    # Assert
+    assert response.status_code == 200
+
+
+def test_search_requires_query(client, searchable_tasks):
+    # Act
+    response = client.get("/tasks/search?q=%20")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.get_json() == {"details": "Invalid q"}
@@ -0,0 +1,78 @@
+import pytest
+from app import db
+from app.models.goal import Goal
+
+
+@pytest.mark.parametrize("method, url, body", [
+    ("put", "/tasks/1", {"title": "Updated", "description": ""}),
+    ("patch", "/tasks/1/mark_complete", None),
+    ("patch", "/tasks/1/mark_incomplete", None),
+])
+def test_task_writes_skip_reload(client, one_task, sql_statements, method, url, body):
+    # Act
+    response = getattr(client, method)(url, json=body)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json()["task"]["id"] == 1
+    # one UPDATE of table_version takes the change_seq and bumps the task
+    # version, then one UPDATE ... RETURNING writes the row; without
+    # RETURNING both are followed by a SELECT
+    assert len(sql_statements) == (2 if db.engine.dialect.name == "postgresql" else 4)
+    assert sum("UPDATE table_version" in statement for statement in sql_statements) == 1
+
+
+def test_update_task_returns_new_values(client, one_task):
+    # Act
+    response = client.put("/tasks/1", json={"title": "Updated", "description": "New"})
+
+    # Assert
+    assert response.get_json() == {"task": {
+        "id": 1,
+        "title": "Updated",
+        "description": "New",
+        "is_complete": False,
+    }}
+
+
+def test_mark_complete_returns_goal_id(client, one_task_belongs_to_one_goal):
+    # Act
+    response = client.patch("/tasks/1/mark_complete")
+
+    # Assert
+    assert response.get_json()["task"]["goal_id"] == 1
+    assert response.get_json()["task"]["is_complete"] is True
+
+
+def test_delete_goal_detaches_tasks(client, one_task_belongs_to_one_goal):
+    # Arrange
+    client.get("/tasks/1")
+
+    # Act
+    response = client.delete("/goals/1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "details": 'Goal 1 "Build a habit of going outside daily" successfully deleted'}
+    assert Goal.query.count() == 0
+    assert "goal_id" not in client.get("/tasks/1").get_json()["task"]
+
+
+@pytest.mark.parametrize("method, url, body, details", [
+    ("put", "/tasks/abc", {"title": "", "description": ""}, "Unknown Task id: abc"),
+    ("delete", "/tasks/1.5", None, "Unknown Task id: 1.5"),
+    ("patch", "/tasks/x/mark_complete", None, "Unknown Task id: x"),
+    ("patch", "/tasks/x/mark_incomplete", None, "Unknown Task id: x"),
+    ("put", "/goals/abc", {"title": ""}, "Unknown Goal id: abc"),
+    ("delete", "/goals/abc", None, "Unknown Goal id: abc"),
+])
+def test_non_integer_ids_never_reach_the_database(
+        client, one_task, sql_statements, method, url, body, details):
+    # Act
+    response = getattr(client, method)(url, json=body)
+
+    # Assert
+    assert response.status_code == 404
+    assert response.get_json() == {"details": details}
+    assert sql_statements == []